@@ -1,24 +1,8 @@
-from pathlib import Path
-
-import pandas as pd
-import statsmodels.formula.api as smf
+from src.sections import load_sections
 
 # %% LOAD DATA
 
-data_folder = Path('./data/raw_sections')
-all_files = data_folder.glob("*.csv")
-
-data = pd.concat([
-    pd.read_csv(file, index_col=0).assign(Filename=file.stem)
-    for file in all_files
-])
-
-# %% ORGANISE DATA
-
-data[['Stage', 'Sample', 'AP', 'CultureTime']] = data.Filename.str.split(' ', expand=True)
-data['CultureTime'] = data['CultureTime'].astype(float)
-
-data = data.groupby(['Stage', 'Sample', 'AP', 'CultureTime']).agg({'Angle': 'mean', 'Length': 'mean'})
+data = load_sections(['Stage', 'Sample', 'AP', 'CultureTime'])
 
 data = data.reset_index()
 
@@ -45,6 +29,8 @@ data_ikemoto = data.loc[
 
 # %%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%% REGRESSION
 #
+import statsmodels.formula.api as smf
+
 model_roller = smf.ols('Length ~ CultureTime', data=data_roller)
 model_roller = model_roller.fit()
 model_roller.params['CultureTime'] / model_roller.params['Intercept']
@@ -67,6 +53,8 @@ model_ikemoto_adj.summary()
 
 # %%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%% WELCH'S T TEST
 
+from scipy.stats import ttest_ind_from_stats
+
 # E12.5
 # print(ttest_ind_from_stats(
 #     mean1=0.0730,
@@ -1,25 +1,11 @@
-from pathlib import Path
-
-import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
 
-# %% LOAD SECTIONS DATA i.e. ALL CSV FILES
-
-data_folder = Path('./data/raw_sections')
-all_files = data_folder.glob("*.csv")
+from src.sections import load_sections
 
-data = pd.concat([
-    pd.read_csv(file, index_col=0).assign(Filename=file.stem)
-    for file in all_files
-])
-
-# %% ORGANISE DATA
-
-data[['Stage', 'Sample', 'AP', 'CultureTime']] = data.Filename.str.split(' ', expand=True)
-data['CultureTime'] = data['CultureTime'].astype(float)
+# %% LOAD SECTIONS DATA i.e. ALL CSV FILES
 
-data = data.groupby(['Stage', 'Sample', 'AP', 'CultureTime']).agg({'Angle': 'mean', 'Length': 'mean'})
+data = load_sections(['Stage', 'Sample', 'AP', 'CultureTime'])
 
 data = data.reset_index()
 
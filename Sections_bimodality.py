@@ -1,22 +1,12 @@
-from pathlib import Path
-
-import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
 
-# %% LOAD DATA i.e. ALL CSV FILES
-
-data_folder = Path('./data/raw_sections')
-all_files = data_folder.glob("*.csv")
+from src.sections import load_sections
+from src.standardise import standardise
 
-data = pd.concat([
-    pd.read_csv(file, index_col=0).assign(Filename=file.stem)
-    for file in all_files
-])
-
-data[['Stage', 'Sample', 'AP', 'CultureTime']] = data.Filename.str.split(' ', expand=True)
+# %% LOAD DATA i.e. ALL CSV FILES
 
-data = data.groupby(['Stage', 'Sample', 'AP']).agg({'Angle': 'mean', 'Length': 'mean'})
+data = load_sections(['Stage', 'Sample', 'AP'])
 
 # %% SAVE DATA AS AN EXCEL FILE
 
@@ -27,9 +17,9 @@ data = data.groupby(['Stage', 'Sample', 'AP']).agg({'Angle': 'mean', 'Length': '
 
 # %% CALCULATE Z SCORES GROUPED BY STAGE & AP
 
-data.groupby(['Stage', 'AP']).mean()
-data['Standardised Angle'] = (data['Angle'] - data.groupby(['Stage', 'AP']).Angle.transform('mean')) / data.groupby(['Stage', 'AP']).Angle.transform('std', ddof=0)
-data['Standardised Length'] = (data['Length'] - data.groupby(['Stage', 'AP']).Length.transform('mean')) / data.groupby(['Stage', 'AP']).Length.transform('std', ddof=0)
+standardised = standardise(data, ['Stage', 'AP'], ['Angle', 'Length'])
+data['Standardised Angle'] = standardised['Angle']
+data['Standardised Length'] = standardised['Length']
 
 data = data.drop(columns=['Angle', 'Length'])
 data = data.reset_index()
@@ -1,23 +1,12 @@
-from pathlib import Path
-import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
-from scipy.stats import ttest_ind
 
-# %% LOAD DATA i.e. ALL CSV FILES
-
-data_folder = Path('./data/raw_sections')
-all_files = data_folder.glob("*.csv")
-
-data = pd.concat([
-    pd.read_csv(file, index_col=0).assign(Filename=file.stem)
-    for file in all_files
-])
+from src.comparisons import welch_tests
+from src.sections import load_sections
 
-data[['Stage', 'Sample', 'AP', 'CultureTime']] = data.Filename.str.split(' ', expand=True)
-data['CultureTime'] = data['CultureTime'].astype(float)
+# %% LOAD DATA i.e. ALL CSV FILES
 
-data = data.groupby(['Stage', 'Sample', 'AP', 'CultureTime']).agg({'Angle': 'mean', 'Length': 'mean'})
+data = load_sections(['Stage', 'Sample', 'AP', 'CultureTime'])
 data = data.reset_index()
 
 # %% ORGANISE DATA FOR T0-T72
@@ -91,13 +80,4 @@ plt.show()
 
 # %%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%% T TEST
 
-data1_ant = data.loc[((data['CultureTime'] == '0 hours') & (data['AP'] == 'ant')), 'Angle']
-data1_mid = data.loc[((data['CultureTime'] == '0 hours') & (data['AP'] == 'mid')), 'Angle']
-data1_post = data.loc[((data['CultureTime'] == '0 hours') & (data['AP'] == 'post')), 'Angle']
-data2_ant = data.loc[((data['CultureTime'] == '72 hours') & (data['AP'] == 'ant')), 'Angle']
-data2_mid = data.loc[((data['CultureTime'] == '72 hours') & (data['AP'] == 'mid')), 'Angle']
-data2_post = data.loc[((data['CultureTime'] == '72 hours') & (data['AP'] == 'post')), 'Angle']
-
-print(ttest_ind(data1_ant, data2_ant, equal_var=False))
-print(ttest_ind(data1_mid, data2_mid, equal_var=False))
-print(ttest_ind(data1_post, data2_post, equal_var=False))
\ No newline at end of file
+print(welch_tests(data, 'Angle', by='AP', contrast='CultureTime', levels=['0 hours', '72 hours']).to_string())
@@ -1,26 +1,11 @@
-from pathlib import Path
-
-import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
-from scipy.stats import ttest_ind_from_stats
-
-# %% LOAD DATA i.e. ALL CSV FILES
-
-data_folder = Path('./data/raw_sections')
-all_files = data_folder.glob("*.csv")
 
-data = pd.concat([
-    pd.read_csv(file, index_col=0).assign(Filename=file.stem)
-    for file in all_files
-])
+from src.sections import load_sections
 
-# %% ORGANISE DATA
-
-data[['Stage', 'Sample', 'AP', 'CultureTime']] = data.Filename.str.split(' ', expand=True)
-data['CultureTime'] = data['CultureTime'].astype(float)
+# %% LOAD DATA i.e. ALL CSV FILES
 
-data = data.groupby(['Stage', 'Sample', 'AP', 'CultureTime']).agg({'Angle': 'mean', 'Length': 'mean'})
+data = load_sections(['Stage', 'Sample', 'AP', 'CultureTime'])
 
 data = data.reset_index()
 
@@ -101,6 +86,8 @@ plt.show()
 
 # %% Regression based on continuous time, Length = m * CultureTime + c
 
+import statsmodels.formula.api as smf
+
 model = smf.ols('Length ~ CultureTime', data=data)
 model = model.fit()
 
@@ -112,6 +99,8 @@ model.summary()
 
 # %%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%% WELCH'S T TEST
 
+from scipy.stats import ttest_ind_from_stats
+
 data1_Ro = data.loc[((data['Stage'] == 'E12.5') & (data['AP'] == 'ant')), 'Angle']
 data1_Ik = data.loc[((data['Stage'] == 'E12.5') & (data['AP'] == 'post')), 'Angle']
 
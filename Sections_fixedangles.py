@@ -1,23 +1,12 @@
-from pathlib import Path
-
-import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
-from scipy.stats import ttest_ind
-
-# %% LOAD DATA i.e. ALL CSV FILES
 
-data_folder = Path('./data/raw_sections')
-all_files = data_folder.glob("*.csv")
+from src.comparisons import welch_tests
+from src.sections import load_sections
 
-data = pd.concat([
-    pd.read_csv(file, index_col=0).assign(Filename=file.stem)
-    for file in all_files
-])
-
-data[['Stage', 'Sample', 'AP', 'CultureTime']] = data.Filename.str.split(' ', expand=True)
+# %% LOAD DATA i.e. ALL CSV FILES
 
-data = data.groupby(['Stage', 'Sample', 'AP']).agg({'Angle': 'mean', 'Length': 'mean'})
+data = load_sections(['Stage', 'Sample', 'AP'])
 data = data.reset_index()
 
 data = data.loc[(data['Stage'] == 'E12.5') & (data['Sample'].str.contains('Fix')) |
@@ -75,13 +64,4 @@ plt.show()
 
 # %%%%%%%%%%%%%%%%%%%%%%%%%%%%% T TEST
 
-data1_ant = data.loc[((data['Stage'] == 'E12.5') & (data['AP'] == 'ant')), 'Angle']
-data1_mid = data.loc[((data['Stage'] == 'E12.5') & (data['AP'] == 'mid')), 'Angle']
-data1_post = data.loc[((data['Stage'] == 'E12.5') & (data['AP'] == 'post')), 'Angle']
-data2_ant = data.loc[((data['Stage'] == 'E15.5') & (data['AP'] == 'ant')), 'Angle']
-data2_mid = data.loc[((data['Stage'] == 'E15.5') & (data['AP'] == 'mid')), 'Angle']
-data2_post = data.loc[((data['Stage'] == 'E15.5') & (data['AP'] == 'post')), 'Angle']
-
-print(ttest_ind(data1_ant, data2_ant, equal_var=False))
-print(ttest_ind(data1_mid, data2_mid, equal_var=False))
-print(ttest_ind(data1_post, data2_post, equal_var=False))
\ No newline at end of file
+print(welch_tests(data, 'Angle', by='AP', contrast='Stage', levels=['E12.5', 'E15.5']).to_string())
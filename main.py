@@ -1,9 +1,28 @@
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
 from pathlib import Path
-import xml.etree.ElementTree as ET
 
 import pandas as pd
 
+from src.cache import collect, discard, load_manifest, manifest_key, new_manifest, save_manifest, stale_files, store
+from src.distances import distance_frame
+from src.excel import write_excel, write_excel_in_background
+from src.instrument import Run
+from src.metadata import points_metadata
+from src.landmarks import from_points, to_table, to_wide
+from src.points import read_points
+from src.store import clear_store, write_partitions, write_store
+from src.summary import merge_cubes, refresh_cube, summarise, write_cube
+from src.validate import InvalidPoints, points_problems
+
 data_folder = Path('./data/raw')
+results_folder = Path('./results')
+cache_path = results_folder / 'ingest_cache.pkl'
 
 point_pairing = (
     ('Ant shelf L', 'Post shelf L'),
@@ -20,60 +39,203 @@ point_pairing = (
     ('Left', 'Right')
 )
 
-def get_point(node):
-    return {'x': float(node.attrib['x']), 'y': float(node.attrib['y'])}
+def create_file_points(filename, required=()):
+    names, coords = read_points(filename)
+    problems = points_problems(filename.stem, names, coords, point_pairing, required)
+    if problems:
+        raise InvalidPoints('; '.join(problems))
+    return names, coords
+
+def blame(filename):
+    print(f'I failed on this name: {filename}. Come on Cathy! Sort it out!!!')
+
+def parse_filename(filename: pd.Series):
+    return points_metadata(filename)[['Info', 'Culture', 'Time']]
+
+def measure_distances(data, pairing=point_pairing):
+    return distance_frame(data, pairing)
 
-def create_file_points(filename):
+def parse_file(filename, required=()):
+    start = time.perf_counter()
     try:
-        tree = ET.parse(filename)
-        root = tree.getroot()
-        data = pd.DataFrame({node.attrib['name']: get_point(node) for node in root})
+        data = create_file_points(filename, required)
     except Exception as e:
-        print(f'I failed on this name: {filename}. Come on Cathy! Sort it out!!!')
-        raise e
-    data['File'] = filename.stem
-    data.loc[:, ['Info', 'Culture', 'Time']] = parse_filename(data['File'])
-    data = data.set_index('File', append=True).reorder_levels([1,0])
-    return data
+        return filename, None, time.perf_counter() - start, f'{type(e).__name__}: {e}'
+    return filename, data, time.perf_counter() - start, None
 
-def parse_filename(filename: pd.Series):
-    mapping = {
-        'E12.5': 0.0,
-        'E13': 12.0,
-        'E13.5': 24.0,
-        'E14': 36.0,
-        'E14.5': 48.0,
-        'E15': 60.0,
-    }
-    result = (
-        filename
-            .str
-            .split(' ', expand=True)
-            .iloc[:, :3]
-            .rename(columns={
-            ix: name
-            for ix, name in enumerate(['Info', 'Culture', 'Time'])
-        })
-    )
-    result['Time'] = result['Time'].str.replace('[A-z]*', '', regex=True).astype(float)
-    result.loc[filename.str.contains('Fix', regex=False), 'Time'] = result['Info'].map(mapping).astype(float)
-    return result
-
-def measure_distances(data):
-    return pd.DataFrame(
-        {f'Dist({x}, {y})': ((data[x] - data[y]) ** 2).sum() ** .5
-         for x, y in point_pairing
-         if x in data.columns and y in data.columns},
-        index=data.index.levels[0]
-    )
+def parse_files(files, required=()):
+    return [parse_file(file, required) for file in files]
+
+def iter_parsed_files(files, workers=None, chunksize=64, required=()):
+    workers = workers or os.cpu_count()
+    files = iter(files)
+    chunks = iter(lambda: list(islice(files, chunksize)), [])
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        # Keep a bounded queue of chunks in flight and hand results back in submission order
+        pending = deque((chunk, executor.submit(parse_files, chunk, required)) for chunk in islice(chunks, 2 * workers))
+        while pending:
+            chunk, future = pending.popleft()
+            try:
+                results = future.result()
+            except BrokenProcessPool as e:
+                # A worker died outright (e.g. out of memory): give up on this chunk, then restart the pool and
+                # resubmit the chunks that were in flight with it
+                results = [(filename, None, 0.0, f'worker crashed: {e}') for filename in chunk]
+                executor.shutdown(cancel_futures=True)
+                executor = ProcessPoolExecutor(max_workers=workers)
+                pending = deque((other, executor.submit(parse_files, other, required)) for other, _ in pending)
+            chunk = next(chunks, None)
+            if chunk is not None:
+                pending.append((chunk, executor.submit(parse_files, chunk, required)))
+            yield from results
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+def iter_parsed_files_serial(files, required=()):
+    for filename in files:
+        start = time.perf_counter()
+        try:
+            data = create_file_points(filename, required)
+        except Exception:
+            blame(filename)
+            raise
+        yield filename, data, time.perf_counter() - start, None
+
+def accepted_files(results, timings, strict=False):
+    """Record every parse result in timings and yield the (filename, points) of the files that passed."""
+    for filename, points, seconds, error in results:
+        timings.append({'File': filename.stem, 'Seconds': seconds, 'Error': error})
+        if error is not None:
+            if strict:
+                blame(filename)
+                raise InvalidPoints(f'{filename}: {error}')
+            continue
+        yield filename, points
+
+def measure_batch(batch):
+    """Long points table and distances, both with the filename metadata, of a list of parsed files."""
+    stems = [filename.stem for filename, _ in batch]
+    names, coords = zip(*(points for _, points in batch))
+    landmarks = from_points(stems, names, coords)
+    metadata = parse_filename(pd.Series(stems, index=stems))
+    distances = measure_distances(landmarks).join(metadata)
+    return to_table(landmarks).join(metadata, on='File'), distances
+
+def count_missing(run, distances):
+    for column, missing in distances.filter(like='Dist(').isna().sum().items():
+        run.count(f'missing {column}', int(missing))
+
+def export_excel(points, distances, path):
+    write_excel({'Points': points, 'Distances': distances}, path)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Collect landmark points and distances into the results folder')
+    parser.add_argument('--parallel', action='store_true', help='parse the .points files in a process pool')
+    parser.add_argument('--workers', type=int, default=None, help='size of the process pool (defaults to the number of cores)')
+    parser.add_argument('--chunksize', type=int, default=64, help='number of files handed to a worker at a time')
+    parser.add_argument('--full-rebuild', action='store_true', help='ignore the ingestion cache and re-parse every file')
+    parser.add_argument('--no-excel', action='store_true', help='only write the parquet store, skip results/data.xlsx')
+    parser.add_argument('--out-of-core', action='store_true', help='write a store partitioned by Info/Culture in batches, without the cache or Excel')
+    parser.add_argument('--batch-size', type=int, default=5000, help='number of files held in memory at a time in out-of-core mode')
+    parser.add_argument('--strict', action='store_true', help='stop on the first invalid file instead of quarantining it')
+    parser.add_argument('--require', nargs='+', default=(), metavar='LANDMARK', help='quarantine files missing any of these landmarks')
+    parser.add_argument('--profile', action='store_true', help='run under cProfile and add the hottest calls to the run report')
+    parser.add_argument('--trace-memory', action='store_true', help='record peak Python allocations per stage with tracemalloc')
+    return parser.parse_args()
 
 if __name__ == '__main__':
-    data = [create_file_points(file) for file in data_folder.glob('*.points')]
-    distances = pd.concat(map(measure_distances, data))
-    distances = pd.concat([distances, parse_filename(pd.Series(distances.index, index=distances.index))], axis=1)
-    data = pd.concat(data)
-
-    writer = pd.ExcelWriter('results/data.xlsx')
-    data.to_excel(writer, sheet_name='Points')
-    distances.to_excel(writer, sheet_name='Distances')
-    writer.save()
+    args = parse_args()
+    run = Run(args.profile, args.trace_memory)
+    files = list(data_folder.glob('*.points'))
+    run.count('files found', len(files))
+
+    if args.out_of_core:
+        # The cache keeps every file's coordinates in memory, so out-of-core runs parse everything again
+        stale = dict.fromkeys(files)
+    else:
+        with run.span('check cache'):
+            manifest = new_manifest(args.require) if args.full_rebuild else load_manifest(cache_path, args.require)
+            previous, known = manifest_key(manifest), set(manifest['files'])
+            stale = stale_files(manifest, files)
+            # Stems of the removed files and, below, of the new or changed ones: the summary groups to redo
+            changed = [Path(key).stem for key in known - set(manifest['files'])]
+        run.count('files from cache', len(files) - len(stale))
+
+    if args.parallel:
+        results = iter_parsed_files(stale, args.workers, args.chunksize, args.require)
+    elif args.strict:
+        results = iter_parsed_files_serial(stale, args.require)
+    else:
+        results = (parse_file(filename, args.require) for filename in stale)
+
+    timings = []
+    parsed = accepted_files(results, timings, args.strict)
+    if args.out_of_core:
+        with run.span('parse and write partitions'):
+            clear_store(results_folder)
+            cube = None
+            batches = iter(lambda: list(islice(parsed, args.batch_size)), [])
+            for part, batch in enumerate(batches):
+                points, distances = measure_batch(batch)
+                write_partitions(points, distances, results_folder, part)
+                cube = summarise(distances) if cube is None else merge_cubes(cube, summarise(distances))
+                count_missing(run, distances)
+                run.count('landmark rows written', len(points))
+                run.count('distances rows written', len(distances))
+            if cube is not None:
+                write_cube(cube, results_folder)
+    else:
+        with run.span('parse'):
+            for filename, points in parsed:
+                store(manifest, filename, stale[filename], points)
+                changed.append(filename.stem)
+            # Cached files that changed and were quarantined must not keep their old points
+            stored = set(changed)
+            for filename in stale:
+                if filename.stem not in stored and discard(manifest, filename):
+                    changed.append(filename.stem)
+            save_manifest(manifest, cache_path)
+
+    timings = pd.DataFrame(timings, columns=['File', 'Seconds', 'Error'])
+    timings.to_csv(results_folder / 'ingest_timings.csv', index=False)
+    failed = timings['Error'].notna()
+    quarantine = timings.loc[failed, ['File', 'Error']].rename(columns={'Error': 'Reason'})
+    quarantine.to_csv(results_folder / 'quarantine.csv', index=False)
+    run.count('files parsed', int((~failed).sum()))
+    run.count('files quarantined', int(failed.sum()))
+    print(f'Parsed {(~failed).sum()} new or changed files, {failed.sum()} quarantined, {len(files) - len(stale)} from cache')
+    for row in quarantine.itertuples():
+        print(f'  {row.File}: {row.Reason}')
+
+    if args.out_of_core:
+        if not args.no_excel:
+            print('Skipping results/data.xlsx in out-of-core mode')
+        run.write(results_folder)
+        raise SystemExit
+
+    with run.span('collect'):
+        landmarks = collect(manifest, files)
+    with run.span('metadata'):
+        metadata = parse_filename(pd.Series(landmarks.files, index=landmarks.files))
+    with run.span('distances'):
+        distances = measure_distances(landmarks).join(metadata)
+    count_missing(run, distances)
+
+    with run.span('write store'):
+        points = to_table(landmarks).join(metadata, on='File')
+        write_store(points, distances, results_folder)
+    excel = None
+    if not args.no_excel:
+        # The parquet store is already published, so the workbook is streamed out while the run finishes
+        sheets = {'Points': to_wide(landmarks).join(metadata, on='File'), 'Distances': distances}
+        excel = write_excel_in_background(sheets, results_folder / 'data.xlsx')
+    with run.span('summary cube'):
+        refresh_cube(distances, changed, previous, manifest_key(manifest), results_folder)
+    run.count('landmark rows written', len(points))
+    run.count('distances rows written', len(distances))
+    if excel is not None:
+        with run.span('wait for excel'):
+            excel.result()
+
+    run.write(results_folder)
@@ -1,28 +1,15 @@
-from pathlib import Path
-
 import pandas as pd
-import statsmodels.formula.api as smf
 import matplotlib.pyplot as plt
-from numpy.random import normal
-import seaborn as sns
-
-
-# %% LOAD DATA
-
-data_folder = Path('./data/raw_sections')
-all_files = data_folder.glob("*.csv")
+from numpy.random import default_rng
 
-data = pd.concat([
-    pd.read_csv(file, index_col=0).assign(Filename=file.stem)
-    for file in all_files
-])
+from src.regression import grouped_ols
+from src.sections import load_sections
+from src.simulation import simulate_normal, split_violinplot
 
-# %% ORGANISE DATA
 
-data[['Stage', 'Sample', 'AP', 'CultureTime']] = data.Filename.str.split(' ', expand=True)
-data['CultureTime'] = data['CultureTime'].astype(float)
+# %% LOAD DATA
 
-data = data.groupby(['Stage', 'Sample', 'AP', 'CultureTime']).agg({'Angle': 'mean', 'Length': 'mean'})
+data = load_sections(['Stage', 'Sample', 'AP', 'CultureTime'])
 
 data = data.reset_index()
 
@@ -49,30 +36,18 @@ data['CultureTime'] = data['CultureTime'].div(24)
 
 
 def create_regression_results(roller, ikemoto):
-    # %%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%% REGRESSION
-
-    model_roller = smf.ols('Length ~ CultureTime', data=roller).fit()
-    model_ikemoto = smf.ols('Length ~ CultureTime', data=ikemoto).fit()
-
-    # %%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%% PERCENTAGE CHANGE
-
-    model_ikemoto_adj = smf.ols(
-        'Length ~ CultureTime',
-        data=ikemoto.assign(Length=ikemoto['Length'] / model_ikemoto.params['Intercept'])
-    ).fit()
-
-    model_roller_adj = smf.ols(
-        'Length ~ CultureTime',
-        data=roller.assign(Length=roller['Length'] / model_roller.params['Intercept'])
-    ).fit()
-
-    rates = pd.DataFrame(
-        data=[
-            [model_ikemoto_adj.params['CultureTime'], model_ikemoto_adj.bse['CultureTime'], model_ikemoto_adj.nobs],
-            [model_roller_adj.params['CultureTime'], model_roller_adj.bse['CultureTime'], model_roller_adj.nobs],
-        ],
-        index=['Ikemoto', 'Roller'],
-        columns=['Growth Rate', 'Standard Error', 'N']
+    # %%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%% REGRESSION & PERCENTAGE CHANGE
+
+    rates = grouped_ols(
+        pd.concat([ikemoto.assign(System='Ikemoto'), roller.assign(System='Roller')]),
+        x='CultureTime',
+        y='Length',
+        by='System'
+    )
+    rates = (
+        rates.loc[['Ikemoto', 'Roller'], ['Rate', 'Rate SE', 'N']]
+            .rename(columns={'Rate': 'Growth Rate', 'Rate SE': 'Standard Error'})
+            .rename_axis(None)
     )
 
     rates['Standard Deviation'] = rates['Standard Error'] * rates['N'].pow(.5)
@@ -127,28 +102,24 @@ growth_rates = {
 # )
 
 
-simulated_data = pd.DataFrame({
-    (sample, name): normal(
+rng = default_rng(0)
+
+simulated_data = {
+    (sample, name): simulate_normal(
         data.loc[name, 'Growth Rate'],
         data.loc[name, 'Standard Deviation'],
-        1000000
+        1000000,
+        rng
     )
     for sample, data in growth_rates.items()
     for name in data.index
-})
-
-simulated_data = simulated_data.stack([0,1]).droplevel(0).to_frame(name='Growth Rate')
-simulated_data.index.names = ['Stage', 'Culture System']
+}
 
-pd.set_option('max_columns', 10)
+pd.set_option('display.max_columns', 10)
 print(pd.concat(growth_rates, axis=1).T)
 
-sns.violinplot(
-    data=simulated_data.reset_index(),
-    hue='Culture System',
-    x='Stage',
-    y='Growth Rate',
-    split=True,
-    inner='quartile'
-)
-plt.show()
\ No newline at end of file
+ax = split_violinplot(simulated_data, plt.gca())
+ax.set_xlabel('Stage')
+ax.set_ylabel('Growth Rate')
+ax.legend(title='Culture System')
+plt.show()
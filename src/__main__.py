@@ -0,0 +1,55 @@
+import runpy
+import sys
+
+# command -> (module run as __main__, description). Nothing heavy is imported here: each command's module, and
+# with it pandas and the plotting libraries, is only loaded once the command is chosen.
+commands = {
+    'ingest': ('main', 'collect the .points files into the results store (main.py)'),
+    'watch': ('src.watch', 'keep the results up to date while the raw data changes'),
+    'sections': ('src.sections', 'aggregate the sections CSVs into results/sections.parquet'),
+    'summary': ('src.summary', 'print summary tables from the distances cube'),
+    'procrustes': ('src.procrustes', 'Procrustes shape analysis of the stored landmarks'),
+    'figures': ('src.figures', 'render the analysis figures headless into results/figures'),
+    'analysis': (None, 'run one figure script with its plots shown, e.g. `analysis ap_growth`'),
+    'benchmark': ('src.benchmark', 'time the pipeline on synthetic data, or the startup with --startup'),
+}
+
+
+def usage():
+    lines = ['usage: python -m src <command> [options]', '', 'commands:']
+    lines += [f'  {name:<12}{description}' for name, (_, description) in commands.items()]
+    lines += ['', "Run 'python -m src <command> --help' for the options of a command."]
+    return '\n'.join(lines)
+
+
+def run_analysis(names):
+    from src.figures import figures
+
+    if not names or names[0] in ('-h', '--help') or any(name not in figures for name in names):
+        print(f'usage: python -m src analysis NAME [NAME ...]\n\nfigures: {", ".join(figures)}')
+        return 0 if names and names[0] in ('-h', '--help') else 2
+    for name in names:
+        runpy.run_path(str(figures[name][0]), run_name='__main__')
+    return 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] in ('-h', '--help'):
+        print(usage())
+        return 0 if argv else 2
+    name, *rest = argv
+    if name not in commands:
+        print(f'{usage()}\n\nunknown command: {name}', file=sys.stderr)
+        return 2
+    if name == 'analysis':
+        return run_analysis(rest)
+    # alter_sys makes the command module __main__ for as long as it runs, so its process pools can pickle the
+    # functions it defines
+    sys.argv = [name, *rest]
+    runpy.run_module(commands[name][0], run_name='__main__', alter_sys=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
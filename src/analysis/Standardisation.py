@@ -1,10 +1,12 @@
 from pathlib import Path
 
-import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
 import numpy as np
 
+from src.standardise import standardise
+from src.store import load_distances
+
 sns.set_style("whitegrid")
 sns.set_context('notebook')
 
@@ -13,10 +15,9 @@ results_folder = Path(__file__).parents[2] / 'results'
 # %% LOAD DATA
 
 data = (
-    pd.read_excel(results_folder / 'data.xlsx', sheet_name='Distances', index_col='File')
-        .loc[:, ['Dist(Ant shelf L, Post shelf L)', 'Dist(Ant shelf R, Post shelf R)',
-                 'Dist(Med shelf L, Post whis L)', 'Dist(Med shelf R, Post whis R)',
-                 'Info', 'Culture', 'Time']]
+    load_distances(['Dist(Ant shelf L, Post shelf L)', 'Dist(Ant shelf R, Post shelf R)',
+                    'Dist(Med shelf L, Post whis L)', 'Dist(Med shelf R, Post whis R)',
+                    'Info', 'Culture', 'Time'])
        )
 
 data['Stage/Fixed'] = np.where(
@@ -39,9 +40,9 @@ data = data.drop(columns=['Dist(Ant shelf L, Post shelf L)', 'Dist(Ant shelf R,
 
 # %% Z-score distances, grouped by stage/fixed & time
 
-data.groupby(['Stage/Fixed', 'Time']).mean()
-data['Standardised AP'] = (data['AP'] - data.groupby(['Stage/Fixed', 'Time']).AP.transform('mean')) / data.groupby(['Stage/Fixed', 'Time']).AP.transform('std', ddof=0)
-data['Standardised ML'] = (data['ML'] - data.groupby(['Stage/Fixed', 'Time']).ML.transform('mean')) / data.groupby(['Stage/Fixed', 'Time']).ML.transform('std', ddof=0)
+standardised = standardise(data, ['Stage/Fixed', 'Time'], ['AP', 'ML'])
+data['Standardised AP'] = standardised['AP']
+data['Standardised ML'] = standardised['ML']
 
 #data = data.rename_axis(columns=['Measurement'])
 #data = data.stack()
@@ -3,7 +3,9 @@ from pathlib import Path
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
-import statsmodels.api as sm
+
+from src.bootstrap import cached_ci, plot_intervals
+from src.query import select
 
 sns.set_style("whitegrid")
 sns.set_context('notebook')
@@ -12,22 +14,24 @@ results_folder = Path(__file__).parents[2] / 'results'
 
 # %% Load Data
 
-data = (
-    pd.read_excel(results_folder / 'data.xlsx', sheet_name='Distances', index_col='File')
-        .set_index(['Info', 'Culture', 'Time'], append=True)
-        .rename_axis(columns=['Measurement'])
-        .stack()
-        .to_frame(name='Distance')
-        .reset_index()
-)
+def stacked(distances):
+    return (
+        distances
+            .set_index(['Info', 'Culture', 'Time'], append=True)
+            .rename_axis(columns=['Measurement'])
+            .stack()
+            .to_frame(name='Distance')
+            .reset_index()
+    )
 
-cultured = data.loc[~data.Culture.str.contains('Fix', regex=False)].copy()
-fixed = data.loc[data.Culture.str.contains('Fix', regex=False)].copy()
+
+cultured = stacked(select(fixed=False))
+fixed = stacked(select(fixed=True))
 
 # %% Plot cultured timeseries
 
 g = sns.FacetGrid(
-    data=cultured.sort_values('Info'),
+    data=cached_ci(cultured, 'Distance', ['Info', 'Measurement', 'Time'], 'cultured_distances'),
     col='Info',
     hue='Measurement',
     col_wrap=2,
@@ -35,7 +39,7 @@ g = sns.FacetGrid(
     sharey=True,
     sharex=True
 )
-g.map(sns.lineplot, 'Time', 'Distance', err_style='bars')
+g.map_dataframe(plot_intervals, x='Time', y='Distance')
 sns.despine(left=True)
 g.set_titles('{col_name}')
 g.add_legend()
@@ -51,12 +55,12 @@ twelve_cultured = pd.concat([
 ])
 
 g = sns.FacetGrid(
-    data=twelve_cultured,
+    data=cached_ci(twelve_cultured, 'Distance', ['Info', 'Measurement', 'Time'], 'E12.5_cultured_distances', level=90),
     col='Info',
     hue='Measurement',
     height=4,
 )
-g.map(sns.lineplot, 'Time', 'Distance', err_style='bars', ci=.9)
+g.map_dataframe(plot_intervals, x='Time', y='Distance')
 g.set_titles('{col_name}')
 g.add_legend()
 sns.despine(left=True)
@@ -68,13 +72,12 @@ plt.savefig(results_folder / 'Distances of POI in E12.5 Cultured Samples over ti
 
 fig, ax = plt.subplots(figsize=(16, 9))
 
-sns.lineplot(
-    data=fixed,
+plot_intervals(
+    cached_ci(fixed, 'Distance', ['Measurement', 'Time'], 'fixed_distances'),
     x='Time',
     y='Distance',
     hue='Measurement',
     ax=ax,
-    err_style='bars',
 )
 ax.set_title('Distances of POI in Fixed Samples over time', fontweight='bold', fontsize=14)
 sns.despine(left=True)
@@ -85,6 +88,8 @@ plt.savefig(results_folder / 'Distances of POI in Fixed Samples over time.png',
 
 # Model linear trend
 
+import statsmodels.api as sm
+
 example = fixed.loc[fixed.Measurement == 'Dist(Left, Right)', :].copy()
 model = sm.OLS(example['Distance'], sm.add_constant(example['Time']))
 model = model.fit()
@@ -1,9 +1,11 @@
 from pathlib import Path
 
-import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
 
+from src.bootstrap import cached_ci, plot_intervals
+from src.query import select
+
 sns.set_style("whitegrid")
 sns.set_context('notebook')
 
@@ -11,8 +13,8 @@ results_folder = Path(__file__).parents[2] / 'results'
 
 # %% Load Data
 
-data = (
-    pd.read_excel(results_folder / 'data.xlsx', sheet_name='Distances', index_col='File')
+invivo = (
+    select(fixed=True)
         .set_index(['Info', 'Culture', 'Time'], append=True)
         .rename_axis(columns=['Measurement'])
         .stack()
@@ -20,8 +22,6 @@ data = (
         .reset_index()
 )
 
-invivo = data.loc[~data.Culture.str.contains('Cul', regex=False)].copy()
-
 measurement_name_mapping = {
     'Dist(Ant shelf L, Post shelf L)': '1-3',
     'Dist(Ant shelf R, Post shelf R)': '2-4',
@@ -48,12 +48,11 @@ time_stage_mapping = {
 # %% Plot
 
 fig, ax = plt.subplots(figsize=(8, 4.5))
-sns.lineplot(
-    data=invivo,
+plot_intervals(
+    cached_ci(invivo, 'Distance', ['Measurement', 'Info'], 'growth_in_vivo'),
     x='Info',
     y='Distance',
     hue='Measurement',
-    err_style='bars',
     ax=ax
 )
 plt.legend(bbox_to_anchor=(1.05, 1), loc=2, borderaxespad=0., title='Measurement')
@@ -0,0 +1,208 @@
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from main import export_excel, iter_parsed_files, parse_filename, point_pairing
+from src import bootstrap
+from src.distances import distance_frame
+from src.figures import render
+from src.metadata import parse_points_name
+from src.landmarks import from_points, to_table, to_wide
+from src.points import read_points
+from src.sections import load_sections, update_sections
+from src.store import _preloaded, load_distances, preload_distances, results_folder, write_store
+from src.summary import preload_cube, summarise
+from src.synthetic import write_points, write_sections
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Excel's sheet limit, less the header row
+EXCEL_ROWS = 1048575
+
+repo_folder = Path(__file__).parents[1]
+
+# Seconds a fresh interpreter may take to start and import each entry point (see startup_times). The CLI itself
+# must not import pandas; the commands pay for pandas and pyarrow but not for the plotting or modelling libraries.
+startup_budget = {
+    'src.__main__': .15,
+    'main': 1.2,
+    'src.watch': 1.2,
+    'src.sections': 1.2,
+    'src.summary': 1.2,
+    'src.procrustes': 1.2,
+    'src.figures': 1.2,
+    'src.growth': 1.2,
+    'src.comparisons': 1.2,
+}
+
+
+def max_rss_mb():
+    """Peak resident memory of the process and its children so far: it never goes down from one stage to the next."""
+    if resource is None:
+        return float('nan')
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return peak / (1 << 20) if sys.platform == 'darwin' else peak / (1 << 10)
+
+
+def generate(workdir: Path, specimens, sections, seed=0):
+    """Synthetic data in workdir, reused when a previous run already generated the same counts."""
+    points_folder = workdir / f'points-{specimens}'
+    sections_folder = workdir / f'sections-{sections}'
+    if not (points_folder / '.done').exists():
+        write_points(points_folder, specimens, seed)
+        (points_folder / '.done').touch()
+    if not (sections_folder / '.done').exists():
+        write_sections(sections_folder, sections, seed)
+        (sections_folder / '.done').touch()
+    return points_folder, sections_folder
+
+
+def parse(files, workers):
+    if workers == 1:
+        results = [(filename.stem, *read_points(filename)) for filename in files]
+    else:
+        results = [(filename.stem, *points) for filename, points, _, error in iter_parsed_files(files, workers) if error is None]
+    stems, names, coords = zip(*results)
+    return from_points(stems, names, coords)
+
+
+def run(specimens, sections, workdir: Path, workers=1, excel=True, figure='ap_growth', trace_memory=False):
+    """
+    Time every pipeline stage on synthetic data and return one record per stage. With `trace_memory` each record
+    also holds the peak Python allocation made during that stage alone, as `peak_mb`.
+    """
+    points_folder, sections_folder = generate(workdir, specimens, sections)
+    output = workdir / f'results-{specimens}'
+    output.mkdir(exist_ok=True)
+    records = []
+
+    def timed(stage, function, *args):
+        if trace_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        result = function(*args)
+        record = {
+            'stage': stage,
+            'specimens': specimens,
+            'seconds': time.perf_counter() - start,
+            'max_rss_mb': max_rss_mb(),
+        }
+        if trace_memory:
+            record['peak_mb'] = tracemalloc.get_traced_memory()[1] / (1 << 20)
+        records.append(record)
+        return result
+
+    files = list(points_folder.glob('*.points'))
+    landmarks = timed('parse', parse, files, workers)
+
+    def metadata():
+        parse_points_name.cache_clear()
+        return parse_filename(pd.Series(landmarks.files, index=landmarks.files))
+    metadata = timed('metadata', metadata)
+
+    distances = timed('distances', lambda: distance_frame(landmarks, point_pairing).join(metadata))
+    data = to_table(landmarks).join(metadata, on='File')
+
+    def aggregate():
+        update_sections(sections_folder, output / 'sections.parquet', full_rebuild=True)
+        return load_sections(folder=sections_folder, path=output / 'sections.parquet')
+    timed('aggregate', aggregate)
+
+    timed('export', write_store, data, distances, output)
+    if excel and 2 * len(landmarks.files) <= EXCEL_ROWS:
+        timed('export_excel', lambda: export_excel(to_wide(landmarks).join(metadata, on='File'), distances, output / 'data.xlsx'))
+
+    if figure:
+        import matplotlib
+        matplotlib.use('Agg')
+        # The figure scripts read results/, so hand them the synthetic distances and cube instead, and keep their
+        # bootstrap intervals out of results/bootstrap
+        stored = load_distances(folder=output)
+        preload_distances(stored)
+        preload_cube(summarise(stored))
+        bootstrap.bootstrap_folder, bootstrap_folder = output / 'bootstrap', bootstrap.bootstrap_folder
+        try:
+            _, _, _, error = timed('render', render, figure, output)
+        finally:
+            _preloaded.clear()
+            bootstrap.bootstrap_folder = bootstrap_folder
+        if error is not None:
+            print(f'Rendering {figure} failed: {error}')
+    return records
+
+
+def startup_times(modules, repeat=5):
+    """Best wall time, over `repeat` runs, of a fresh interpreter importing each module from the repo root."""
+    times = {}
+    for module in modules:
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, '-c', f'import {module}'], cwd=repo_folder, check=True)
+            best = min(best, time.perf_counter() - start)
+        times[module] = best
+    return times
+
+
+def compare(records, baseline):
+    """Ratio of each stage's time to the baseline run with the same specimen count."""
+    current = pd.DataFrame(records).set_index(['specimens', 'stage'])['seconds']
+    previous = pd.DataFrame(baseline['records']).set_index(['specimens', 'stage'])['seconds']
+    return (current / previous).dropna().rename('ratio')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time the ingestion and analysis pipeline on synthetic specimens')
+    parser.add_argument('--specimens', type=int, nargs='+', default=[1000], help='numbers of .points files to generate')
+    parser.add_argument('--sections', type=int, default=200, help='number of sections samples to generate')
+    parser.add_argument('--workers', type=int, default=1, help='parse with a process pool of this size')
+    parser.add_argument('--workdir', type=Path, default=None, help='where to keep the synthetic data (default: a temp dir)')
+    parser.add_argument('--no-excel', action='store_true', help='skip the Excel export stage')
+    parser.add_argument('--figure', default='ap_growth', help='registered figure to render, empty to skip')
+    parser.add_argument('--output', type=Path, default=None, help='where to write the JSON results')
+    parser.add_argument('--baseline', type=Path, default=None, help='previous JSON results to compare against')
+    parser.add_argument('--trace-memory', action='store_true', help='record the peak Python allocations of each stage with tracemalloc (slows the stages down)')
+    parser.add_argument('--startup', action='store_true', help='only time the imports of the entry points against their budget')
+    args = parser.parse_args()
+
+    if args.startup:
+        startup = pd.DataFrame({'seconds': startup_times(startup_budget), 'budget': startup_budget})
+        startup['over budget'] = startup['seconds'] > startup['budget']
+        print(startup.to_string(float_format='{:.3f}'.format))
+        sys.exit(int(startup['over budget'].any()))
+
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix='palate-benchmark-'))
+    workdir.mkdir(parents=True, exist_ok=True)
+    records = []
+    if args.trace_memory:
+        tracemalloc.start()
+    for specimens in args.specimens:
+        records += run(specimens, args.sections, workdir, args.workers, not args.no_excel, args.figure, args.trace_memory)
+
+    results = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'workers': args.workers,
+        'records': records,
+    }
+    output = args.output or results_folder / 'benchmarks' / f'benchmark-{datetime.now():%Y%m%d-%H%M%S}.json'
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+
+    print(pd.DataFrame(records).to_string(index=False))
+    print(f'Results written to {output}')
+    if args.baseline:
+        print(compare(records, json.loads(args.baseline.read_text())).to_string())
@@ -0,0 +1,90 @@
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+bootstrap_folder = Path(__file__).parents[1] / 'results' / 'bootstrap'
+
+
+def bootstrap_ci(data, value, by, level=95, n_boot=1000, seed=0, chunksize=100):
+    """
+    Mean of `value` in every group of `by` with a percentile bootstrap interval, like seaborn's
+    errorbar=('ci', level). All groups are resampled together: every round draws one shared set of uniforms that
+    each group scales to its own size, so the whole table costs n_boot vectorized passes over the data. Missing
+    values are dropped and the result is reproducible for a given seed.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    data = data[[*by, value]].dropna()
+    grouped = data.groupby(by, sort=True, observed=True)
+    codes = grouped.ngroup().to_numpy()
+    order = np.argsort(codes, kind='stable')
+    codes, values = codes[order], data[value].to_numpy(dtype=float)[order]
+    counts = np.bincount(codes)
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    local = np.arange(len(values)) - offsets[codes]
+
+    rng = np.random.default_rng(seed)
+    means = np.empty((n_boot, len(counts)))
+    for start in range(0, n_boot, chunksize):
+        rounds = min(chunksize, n_boot - start)
+        uniforms = rng.random((rounds, counts.max()))
+        draws = offsets[codes] + (uniforms[:, local] * counts[codes]).astype(np.int64)
+        means[start:start + rounds] = np.add.reduceat(values[draws], offsets[:-1], axis=1) / counts
+
+    tail = (100 - level) / 2
+    low, high = np.percentile(means, [tail, 100 - tail], axis=0)
+    table = grouped[value].agg(['mean', 'size']).set_axis([value, 'N'], axis=1)
+    return table.assign(Low=low, High=high).reset_index()
+
+
+def cached_ci(data, value, by, name, level=95, n_boot=1000, seed=0, folder=None):
+    """
+    bootstrap_ci, kept as <folder>/<name>.parquet (bootstrap_folder, results/bootstrap, by default) and only
+    recomputed when the data or the settings change.
+    """
+    folder = bootstrap_folder if folder is None else folder
+    by = [by] if isinstance(by, str) else list(by)
+    digest = hashlib.sha256(pd.util.hash_pandas_object(data[[*by, value]], index=False).to_numpy().tobytes())
+    digest.update(repr((value, by, level, n_boot, seed)).encode())
+    key = digest.hexdigest()
+
+    path = folder / f'{name}.parquet'
+    if path.exists():
+        table = pd.read_parquet(path)
+        if table.attrs.get('key') == key:
+            return table
+    table = bootstrap_ci(data, value, by, level, n_boot, seed)
+    table.attrs['key'] = key
+    folder.mkdir(parents=True, exist_ok=True)
+    table.to_parquet(path, index=False)
+    return table
+
+
+def plot_intervals(data, x, y, hue=None, hue_order=None, palette=None, ax=None, color=None, label=None, **kwargs):
+    """
+    Lines through the group means of a bootstrap_ci table with the intervals drawn as bars, like
+    sns.lineplot(err_style='bars'). Also works as a FacetGrid.map_dataframe function.
+    """
+    import matplotlib.pyplot as plt
+
+    ax = ax or plt.gca()
+    if hue is None:
+        levels = [(label, data)]
+    else:
+        hue_order = hue_order or list(pd.unique(data[hue]))
+        levels = [(level, data.loc[data[hue] == level]) for level in hue_order]
+    for i, (level, group) in enumerate(levels):
+        group = group.sort_values(x)
+        line_color = palette[level] if palette else (color or 'C0' if hue is None else f'C{i}')
+        ax.plot(np.asarray(group[x]), group[y], color=line_color, label=level, **kwargs)
+        ax.errorbar(
+            np.asarray(group[x]), group[y],
+            yerr=[group[y] - group['Low'], group['High'] - group[y]],
+            fmt='none', ecolor=line_color
+        )
+    ax.set_xlabel(x)
+    ax.set_ylabel(y)
+    if hue is not None:
+        ax.legend(title=hue)
+    return ax
@@ -0,0 +1,103 @@
+import hashlib
+import os
+import pickle
+from pathlib import Path
+
+from src.landmarks import from_points
+
+MANIFEST_VERSION = 5
+
+
+def file_key(file):
+    """Manifest key of a file: its absolute path, so tools globbing relative and absolute folders share entries."""
+    return str(Path(file).resolve())
+
+
+def new_manifest(required=()):
+    return {'version': MANIFEST_VERSION, 'required': sorted(required), 'files': {}}
+
+
+def load_manifest(path: Path, required=()):
+    """
+    The manifest at path, or an empty one when it is missing, of another version or validated the files against
+    other `required` landmarks (its entries only hold the files that passed those).
+    """
+    try:
+        with open(path, 'rb') as f:
+            manifest = pickle.load(f)
+    except FileNotFoundError:
+        return new_manifest(required)
+    if manifest.get('version') != MANIFEST_VERSION or manifest.get('required') != sorted(required):
+        return new_manifest(required)
+    return manifest
+
+
+def save_manifest(manifest, path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp, 'wb') as f:
+        pickle.dump(manifest, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def file_hash(path: Path, block_size=1 << 16):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def stale_files(manifest, files):
+    """
+    Drop entries for files that no longer exist and return a {file: signature} dict of the files that were added
+    or changed. Files whose size and mtime match the manifest are not read; the others are only re-parsed when
+    their content hash differs.
+    """
+    entries = manifest['files']
+    current = {file_key(file): file for file in files}
+    for key in set(entries) - set(current):
+        del entries[key]
+
+    stale = {}
+    for key, file in current.items():
+        stat = file.stat()
+        signature = {'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+        entry = entries.get(key)
+        if entry is not None and (entry['size'], entry['mtime']) == (signature['size'], signature['mtime']):
+            continue
+        signature['hash'] = file_hash(file)
+        if entry is not None and entry['hash'] == signature['hash']:
+            entry.update(signature)
+            continue
+        stale[file] = signature
+    return stale
+
+
+def manifest_key(manifest):
+    """Changes whenever a file is added to, changed in or dropped from the manifest."""
+    digest = hashlib.sha256()
+    for key in sorted(manifest['files']):
+        digest.update(f'{key}:{manifest["files"][key]["hash"]}'.encode())
+    return digest.hexdigest()
+
+
+def store(manifest, file, signature, points):
+    names, coords = points
+    manifest['files'][file_key(file)] = {**signature, 'stem': file.stem, 'names': names, 'coords': coords}
+
+
+def discard(manifest, file):
+    """Forget a file, e.g. a cached one that changed and no longer parses, so its old points are not served."""
+    return manifest['files'].pop(file_key(file), None) is not None
+
+
+def collect(manifest, files):
+    """Landmarks of the cached points of files, in the order given."""
+    keys = [file_key(file) for file in files]
+    entries = [manifest['files'][key] for key in keys if key in manifest['files']]
+    return from_points(
+        [entry['stem'] for entry in entries],
+        [entry['names'] for entry in entries],
+        [entry['coords'] for entry in entries]
+    )
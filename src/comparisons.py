@@ -0,0 +1,102 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+
+def welch_t(n1, mean1, var1, n2, mean2, var2):
+    """Welch's t statistic, degrees of freedom and two-sided p value from group statistics (broadcasts)."""
+    from scipy.special import stdtr
+
+    se1, se2 = var1 / n1, var2 / n2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = (mean1 - mean2) / np.sqrt(se1 + se2)
+        df = (se1 + se2) ** 2 / (se1 ** 2 / (n1 - 1) + se2 ** 2 / (n2 - 1))
+    # Student's t survival function, as scipy.stats.t.sf without importing all of scipy.stats
+    return t, df, 2 * stdtr(df, -np.abs(t))
+
+
+def _permuted_t(values, n1, permutations, rng, chunksize=10_000):
+    """How many random relabelings of values reach the |t| of the observed split (first n1 against the rest)."""
+    n = len(values)
+    observed = abs(_split_t(values[None, :], n1)[0])
+    exceed = 0
+    for start in range(0, permutations, chunksize):
+        rounds = min(chunksize, permutations - start)
+        order = rng.permuted(np.tile(np.arange(n), (rounds, 1)), axis=1)
+        exceed += int((np.abs(_split_t(values[order], n1)) >= observed - 1e-12).sum())
+    return exceed
+
+
+def _split_t(samples, n1):
+    first, second = samples[:, :n1], samples[:, n1:]
+    return welch_t(
+        n1, first.mean(axis=1), first.var(axis=1, ddof=1),
+        second.shape[1], second.mean(axis=1), second.var(axis=1, ddof=1)
+    )[0]
+
+
+def _permutation_counts(strata, permutations, seed):
+    rng = np.random.default_rng(seed)
+    return [_permuted_t(values, n1, permutations, rng) for values, n1 in strata]
+
+
+def welch_tests(data, values, by, contrast, levels, permutations=0, correction=None, alpha=.05, seed=0, workers=None):
+    """
+    Welch t-tests of levels[0] against levels[1] of the `contrast` column, for every measure in `values` and
+    every stratum of the `by` columns, from one grouped pass over the data. With `permutations` each test also
+    gets a permutation p value (label shuffles spread over `workers` processes, seeded); `correction` is any
+    statsmodels multipletests method ('holm', 'bonferroni', 'fdr_bh', ...) applied across all the tests, to the
+    permutation p values when there are any. Returns one row per test.
+    """
+    values = [values] if isinstance(values, str) else list(values)
+    by = [by] if isinstance(by, str) else list(by)
+    data = data.loc[data[contrast].isin(levels), [*by, contrast, *values]]
+    long = data.melt(id_vars=[*by, contrast], value_vars=values, var_name='Measure').dropna(subset=['value'])
+    keys = [*by, 'Measure']
+
+    grouped = (
+        long.groupby([*keys, contrast], observed=True)['value']
+            .agg(['count', 'mean', 'var'])
+            .unstack(contrast)
+            .reindex(columns=pd.MultiIndex.from_product([['count', 'mean', 'var'], levels]))
+    )
+    first, second = (grouped.xs(level, axis=1, level=1) for level in levels)
+    t, df, p = welch_t(first['count'], first['mean'], first['var'], second['count'], second['mean'], second['var'])
+    results = pd.DataFrame({
+        'N1': first['count'], 'Mean1': first['mean'], 'SD1': np.sqrt(first['var']),
+        'N2': second['count'], 'Mean2': second['mean'], 'SD2': np.sqrt(second['var']),
+        'Difference': first['mean'] - second['mean'],
+        't': t, 'df': df, 'p': p,
+    })
+
+    if permutations:
+        # Every stratum's values ordered first level first, so a permutation only has to shuffle positions
+        groups = dict(iter(long.groupby(keys, observed=True)))
+        strata = []
+        for key in results.index:
+            group = groups[key if isinstance(key, tuple) else (key,)]
+            a = group.loc[group[contrast] == levels[0], 'value'].to_numpy()
+            b = group.loc[group[contrast] == levels[1], 'value'].to_numpy()
+            strata.append((np.concatenate([a, b]), len(a)))
+        workers = workers or 1
+        shares = [permutations // workers + (i < permutations % workers) for i in range(workers)]
+        seeds = np.random.SeedSequence(seed).spawn(workers)
+        if workers == 1:
+            counts = [_permutation_counts(strata, shares[0], seeds[0])]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                counts = list(executor.map(_permutation_counts, [strata] * workers, shares, seeds))
+        results['p (permutation)'] = (np.sum(counts, axis=0) + 1) / (permutations + 1)
+        results.loc[results['t'].isna(), 'p (permutation)'] = np.nan
+
+    if correction:
+        from statsmodels.stats.multitest import multipletests
+
+        column = 'p (permutation)' if permutations else 'p'
+        tested = results[column].notna()
+        reject, adjusted, _, _ = multipletests(results.loc[tested, column], alpha=alpha, method=correction)
+        results.loc[tested, 'p adjusted'] = adjusted
+        results.loc[tested, 'Significant'] = reject
+
+    return results.reset_index()
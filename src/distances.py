@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from src.landmarks import Landmarks, pack
+
+
+def pack_landmarks(points, landmarks):
+    """
+    Pack a Points frame (rows (File, x/y), one column per landmark) or Landmarks into a (files, landmarks, 2) array.
+    Landmarks a file does not have, or that no file has, are NaN.
+    """
+    if isinstance(points, Landmarks):
+        return pd.Index(points.files, name='File'), pack(points, landmarks)
+    x = points.xs('x', level=1).reindex(columns=landmarks)
+    y = points.xs('y', level=1).reindex(columns=landmarks)
+    return x.index, np.stack([x.to_numpy(dtype=float), y.to_numpy(dtype=float)], axis=-1)
+
+
+def measure_pairs(coords, landmarks, pairing):
+    """Distance of every pair for every file in one pass: (files, landmarks, 2) -> (files, pairs)"""
+    index = {name: i for i, name in enumerate(landmarks)}
+    left = [index[x] for x, _ in pairing]
+    right = [index[y] for _, y in pairing]
+    return np.sqrt(((coords[:, left] - coords[:, right]) ** 2).sum(axis=-1))
+
+
+def pairwise_distances(coords):
+    """Full distance matrix between all landmarks of every file: (files, landmarks, 2) -> (files, landmarks, landmarks)"""
+    return np.sqrt(((coords[:, :, None] - coords[:, None, :]) ** 2).sum(axis=-1))
+
+
+def distance_frame(points, pairing):
+    landmarks = list(dict.fromkeys(name for pair in pairing for name in pair))
+    files, coords = pack_landmarks(points, landmarks)
+    return pd.DataFrame(
+        measure_pairs(coords, landmarks, pairing),
+        index=files,
+        columns=[f'Dist({x}, {y})' for x, y in pairing]
+    )
+
+
+def pairwise_frame(points, landmarks):
+    """Long (File, From, To) -> Distance table of every landmark pair of every file."""
+    files, coords = pack_landmarks(points, landmarks)
+    index = pd.MultiIndex.from_product([files, landmarks, landmarks], names=['File', 'From', 'To'])
+    return pd.Series(pairwise_distances(coords).ravel(), index=index, name='Distance')
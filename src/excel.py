@@ -0,0 +1,84 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+# Rows in an Excel worksheet, header included
+excel_max_rows = 1_048_576
+
+
+def sheet_parts(name, frame, max_rows=excel_max_rows):
+    """
+    (sheet name, first row, end row) of every sheet the frame needs: 'Points', 'Points (2)', ... Rows sharing
+    the outer index labels of a MultiIndex (the x and y rows of a file) are never split across sheets.
+    """
+    step = max(len(frame.index.levels[-1]), 1) if isinstance(frame.index, pd.MultiIndex) else 1
+    rows = (max_rows - 1) // step * step
+    starts = range(0, max(len(frame), 1), rows)
+    return [
+        (name if part == 0 else f'{name} ({part + 1})', start, min(start + rows, len(frame)))
+        for part, start in enumerate(starts)
+    ]
+
+
+def _cells(frame):
+    frame = frame.astype({column: 'float64' for column in frame.select_dtypes('number').columns})
+    values = frame.to_numpy(dtype=object)
+    return np.where(pd.isna(values), None, values)
+
+
+def _write_sheet(worksheet, frame, header_format, chunksize):
+    levels = frame.index.nlevels
+    worksheet.write_row(0, 0, [*frame.index.names, *frame.columns], header_format)
+    previous = None
+    for start in range(0, len(frame), chunksize):
+        chunk = frame.iloc[start:start + chunksize]
+        labels = chunk.index.to_frame(index=False).to_numpy(dtype=object)
+        for row, (label, values) in enumerate(zip(labels, _cells(chunk)), start=start + 1):
+            # Like pandas, outer index labels are only written where they change; read_excel fills them down
+            shown = [None if previous is not None and level < levels - 1 and label[level] == previous[level] else value
+                     for level, value in enumerate(label)]
+            worksheet.write_row(row, 0, shown, header_format)
+            worksheet.write_row(row, levels, values)
+            previous = label
+
+
+def write_excel(sheets, path, chunksize=10_000, max_rows=excel_max_rows):
+    """
+    Write {sheet name: frame} into an xlsx laid out like DataFrame.to_excel. With xlsxwriter installed the rows
+    are streamed `chunksize` at a time through its constant_memory mode, so the workbook is never held in memory,
+    and frames longer than a sheet continue on 'Name (2)', 'Name (3)', ... Falls back on pd.ExcelWriter otherwise.
+    """
+    if xlsxwriter is None:
+        with pd.ExcelWriter(path) as writer:
+            for name, frame in sheets.items():
+                for sheet, start, stop in sheet_parts(name, frame, max_rows):
+                    frame.iloc[start:stop].to_excel(writer, sheet_name=sheet)
+        return
+
+    with xlsxwriter.Workbook(path, {'constant_memory': True}) as workbook:
+        header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+        for name, frame in sheets.items():
+            for sheet, start, stop in sheet_parts(name, frame, max_rows):
+                _write_sheet(workbook.add_worksheet(sheet), frame.iloc[start:stop], header_format, chunksize)
+
+
+def replace_excel(sheets, path, chunksize=10_000):
+    """write_excel into a temporary file that then replaces path, so readers never see a half-written workbook."""
+    tmp = path.with_name(path.stem + '.tmp' + path.suffix)
+    write_excel(sheets, tmp, chunksize)
+    os.replace(tmp, path)
+
+
+def write_excel_in_background(sheets, path, chunksize=10_000):
+    """Start replace_excel in a background thread and return its Future."""
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='excel')
+    future = executor.submit(replace_excel, sheets, path, chunksize)
+    executor.shutdown(wait=False)
+    return future
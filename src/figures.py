@@ -0,0 +1,178 @@
+import argparse
+import ast
+import hashlib
+import json
+import runpy
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from pathlib import Path
+
+import pandas as pd
+
+from src.sections import aggregate_columns, key_columns, sections_store, update_sections
+from src.store import load_distances, preload_distances, results_folder
+
+repo_folder = Path(__file__).parents[1]
+analysis_folder = repo_folder / 'src' / 'analysis'
+figures_folder = results_folder / 'figures'
+manifest_path = figures_folder / 'manifest.json'
+
+# Each input is a tuple of alternatives, of which the first that exists is the one the scripts read: the
+# distances come from the parquet store, else its partitions, else data.xlsx
+distances_inputs = [(results_folder / 'distances.parquet', results_folder / 'distances', results_folder / 'data.xlsx')]
+sections_inputs = [(sections_store,)]
+# The summary cube, summarised from the distances when it is missing
+summary_inputs = [(results_folder / 'summary.parquet', *distances_inputs[0]), (results_folder / 'summary_sketch.parquet',)]
+
+# name -> (script, data files it reads)
+figures = {
+    'ap_growth': (analysis_folder / 'ap_growth.py', summary_inputs),
+    'ml_growth': (analysis_folder / 'ml_growth.py', distances_inputs),
+    'Ikemoto_growth': (analysis_folder / 'Ikemoto_growth.py', summary_inputs),
+    'analysis': (analysis_folder / 'analysis.py', distances_inputs),
+    'Standardisation': (analysis_folder / 'Standardisation.py', distances_inputs),
+    'growth_in_culture': (analysis_folder / 'growth_in_culture.py', distances_inputs),
+    'growth_in_vivo': (analysis_folder / 'growth_in_vivo.py', distances_inputs),
+    'Sections_GrowthRates': (repo_folder / 'Sections_GrowthRates.py', sections_inputs),
+    'Sections_Ikemoto': (repo_folder / 'Sections_Ikemoto.py', sections_inputs),
+    'Sections_bimodality': (repo_folder / 'Sections_bimodality.py', sections_inputs),
+    'Sections_culturedangles_00-T0': (repo_folder / 'Sections_culturedangles_00-T0.py', sections_inputs),
+    'Sections_culturedangles_T0-T20': (repo_folder / 'Sections_culturedangles_T0-T20.py', sections_inputs),
+    'Sections_culturedangles_T0-T72': (repo_folder / 'Sections_culturedangles_T0-T72.py', sections_inputs),
+    'Sections_culturedgrowth': (repo_folder / 'Sections_culturedgrowth.py', sections_inputs),
+    'Sections_fixedangles': (repo_folder / 'Sections_fixedangles.py', sections_inputs),
+    'Sections_fixedgrowth': (repo_folder / 'Sections_fixedgrowth.py', sections_inputs),
+    'Growth Rates': (repo_folder / 'src' / '% Growth Rates.py', sections_inputs),
+}
+
+
+def source_files(script):
+    """The script and every repo module it imports (main.py and src/*), directly or through other modules."""
+    found, pending = [], [script]
+    while pending:
+        path = pending.pop()
+        if path in found:
+            continue
+        found.append(path)
+        for node in ast.walk(ast.parse(path.read_bytes())):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                names = [node.module, *(f'{node.module}.{alias.name}' for alias in node.names)]
+            else:
+                continue
+            for name in names:
+                if name == 'main' or name.startswith('src.'):
+                    module = repo_folder.joinpath(*name.split('.'))
+                    pending += [path for path in [module.with_suffix('.py'), module / '__init__.py'] if path.is_file()]
+    return sorted(found)
+
+
+def _hash_path(digest, path):
+    files = sorted(file for file in path.rglob('*') if file.is_file()) if path.is_dir() else [path]
+    for file in files:
+        digest.update(file.name.encode())
+        digest.update(file.read_bytes())
+
+
+def _hash_sections(digest, path):
+    # The store also keeps each CSV's size and mtime, which change whenever a file is merely touched
+    table = pd.read_parquet(path, columns=['Filename', *key_columns, 'CultureType', *aggregate_columns])
+    table = table.sort_values('Filename', kind='stable', ignore_index=True)
+    digest.update(pd.util.hash_pandas_object(table, index=False).to_numpy().tobytes())
+
+
+def figure_key(script, inputs):
+    """
+    Changes whenever the code of the script or of a repo module it imports changes, or the content of the inputs
+    it reads does; rewriting identical files (as every ingestion does) keeps the key.
+    """
+    digest = hashlib.sha256()
+    for path in source_files(script):
+        _hash_path(digest, path)
+    for alternatives in inputs:
+        path = next((path for path in alternatives if path.exists()), None)
+        if path is not None:
+            (_hash_sections if path == sections_store else _hash_path)(digest, path)
+    return digest.hexdigest()
+
+
+def init_worker(distances):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot  # noqa: F401
+    if distances is not None:
+        preload_distances(distances)
+
+
+def render(name, folder=figures_folder):
+    """
+    Run a figure script headless: every plt.show() and any figure left open at the end is saved under
+    folder, and whatever the script prints goes to folder/<name>.txt.
+    """
+    import matplotlib.pyplot as plt
+
+    script, _ = figures[name]
+    saved = []
+
+    def show(*args, **kwargs):
+        for number in plt.get_fignums():
+            path = folder / (f'{name}.png' if not saved else f'{name}-{len(saved) + 1}.png')
+            plt.figure(number).savefig(path)
+            saved.append(path)
+        plt.close('all')
+
+    plt.show = show
+    start = time.perf_counter()
+    try:
+        with open(folder / f'{name}.txt', 'w') as f, redirect_stdout(f):
+            runpy.run_path(str(script), run_name='__main__')
+        show()
+    except Exception as e:
+        plt.close('all')
+        return name, time.perf_counter() - start, len(saved), repr(e)
+    return name, time.perf_counter() - start, len(saved), None
+
+
+def build(names=None, workers=None, force=False):
+    names = list(figures) if names is None else names
+    figures_folder.mkdir(parents=True, exist_ok=True)
+    update_sections()
+
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+    keys = {name: figure_key(*figures[name]) for name in names}
+    stale = [name for name in names if force or manifest.get(name) != keys[name]]
+
+    reads_distances = any(set(group) & set(distances_inputs[0]) for name in stale for group in figures[name][1])
+    distances = load_distances() if reads_distances else None
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(distances,)) as executor:
+        results = list(executor.map(render, stale))
+
+    for name, _, _, error in results:
+        if error is None:
+            manifest[name] = keys[name]
+        else:
+            manifest.pop(name, None)
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+
+    report = pd.DataFrame(results, columns=['Figure', 'Seconds', 'Saved', 'Error'])
+    report.to_csv(figures_folder / 'timings.csv', index=False)
+    return report, [name for name in names if name not in stale]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Render the analysis figures into results/figures')
+    parser.add_argument('names', nargs='*', help=f'figures to build (default: all of {", ".join(figures)})')
+    parser.add_argument('--workers', type=int, default=None, help='size of the process pool')
+    parser.add_argument('--force', action='store_true', help='rebuild figures even if nothing changed')
+    args = parser.parse_args()
+    unknown = set(args.names) - set(figures)
+    if unknown:
+        parser.error(f'unknown figures: {", ".join(sorted(unknown))}')
+
+    report, skipped = build(args.names or None, args.workers, args.force)
+    for row in report.itertuples():
+        print(f'{row.Figure:<32} {row.Seconds:7.2f}s  {row.Saved} saved' + (f'  FAILED: {row.Error}' if pd.notna(row.Error) else ''))
+    if skipped:
+        print(f'Up to date: {", ".join(skipped)}')
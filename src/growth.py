@@ -0,0 +1,58 @@
+from src.bootstrap import cached_ci, plot_intervals
+from src.store import load_distances
+from src.summary import group_columns, load_cube, rollup
+from src.transforms import align_time
+
+stage_order = ['In vivo', 'E12.5', 'E13.5']
+stage_palette = {'E12.5': '#f210ea', 'E13.5': '#2AA61B', 'In vivo': '#000054'}
+
+
+def growth_means(measurements, name='Distance', pooled=True):
+    """
+    Mean of the `measurements` in every Info/Culture/Time group as `name`, with the CultureType, Stage/Fixed and
+    developmental age (Time) of align_time. Pooled means weigh every left and right measurement alike and come
+    from the summary cube; otherwise each file's measurements are averaged first, from the distances.
+    """
+    if pooled:
+        data = rollup(load_cube(), group_columns, measurements)['mean'].rename(name).reset_index()
+    else:
+        data = load_distances([*measurements, *group_columns])
+        data = (
+            data[measurements].mean(axis=1).to_frame(name=name)
+                .join(data[group_columns])
+                .groupby(group_columns, observed=True)[name]
+                .mean()
+                .reset_index()
+        )
+    return align_time(data)
+
+
+def plot_growth(data, y, cache, ylabel, xlabel='Embryonic Age (days)', tick_size=14, legend_size=16):
+    """
+    Growth curves of `y` against age per Stage/Fixed with their bootstrap intervals (kept under `cache`, see
+    bootstrap.cached_ci), in the style of the growth figures, then plt.show().
+    """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    sns.set_style('whitegrid')
+    sns.set_context('notebook')
+    ax = plot_intervals(
+        cached_ci(data, y, ['Stage/Fixed', 'Time'], cache),
+        x='Time',
+        y=y,
+        hue='Stage/Fixed',
+        hue_order=stage_order,
+        palette=stage_palette,
+        lw=3,
+    )
+    ax.set_xlabel(xlabel, fontsize=16)
+    ax.set_ylabel(ylabel, fontsize=16)
+    if tick_size:
+        plt.tick_params(axis='x', labelsize=tick_size)
+        plt.tick_params(axis='y', labelsize=tick_size)
+    plt.legend(title=None, fontsize=legend_size)
+    sns.despine(left=True)
+    plt.tight_layout()
+    plt.show()
+    return ax
@@ -0,0 +1,103 @@
+import cProfile
+import html
+import io
+import json
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+
+class Run:
+    """
+    Timed spans and counters for one pipeline run. With `profile` the whole run is under cProfile, with
+    `trace_memory` every span also records the peak Python allocation made while it was open.
+    """
+
+    def __init__(self, profile=False, trace_memory=False):
+        self.started = datetime.now()
+        self.spans = []
+        self.counters = {}
+        self.profiler = cProfile.Profile() if profile else None
+        self.trace_memory = trace_memory
+        self._start = time.perf_counter()
+        if self.trace_memory:
+            tracemalloc.start()
+        if self.profiler:
+            self.profiler.enable()
+
+    @contextmanager
+    def span(self, name):
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            span = {'name': name, 'seconds': time.perf_counter() - start}
+            if self.trace_memory:
+                span['peak_mb'] = tracemalloc.get_traced_memory()[1] / (1 << 20)
+            self.spans.append(span)
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def stop(self):
+        """Stop profiling and memory tracing and return the report as a dict."""
+        report = {
+            'started': self.started.isoformat(timespec='seconds'),
+            'seconds': time.perf_counter() - self._start,
+            'spans': self.spans,
+            'counters': self.counters,
+        }
+        if self.profiler:
+            self.profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(self.profiler, stream=out).sort_stats('cumulative').print_stats(30)
+            report['profile'] = out.getvalue()
+        if self.trace_memory:
+            top = tracemalloc.take_snapshot().statistics('lineno')[:15]
+            report['allocations'] = [{'where': str(stat.traceback), 'mb': stat.size / (1 << 20)} for stat in top]
+            tracemalloc.stop()
+        return report
+
+    def write(self, folder, name='run_report'):
+        """Write <name>.json and <name>.html into folder, plus <name>.prof when profiling."""
+        report = self.stop()
+        if self.profiler:
+            self.profiler.dump_stats(folder / f'{name}.prof')
+        (folder / f'{name}.json').write_text(json.dumps(report, indent=2, default=str))
+        (folder / f'{name}.html').write_text(render_html(report))
+        return report
+
+
+def _table(rows, columns):
+    head = ''.join(f'<th>{html.escape(column)}</th>' for column in columns)
+    body = ''.join(
+        '<tr>' + ''.join(f'<td>{_cell(row.get(column))}</td>' for column in columns) + '</tr>'
+        for row in rows
+    )
+    return f'<table><tr>{head}</tr>{body}</table>'
+
+
+def _cell(value):
+    return f'{value:.3f}' if isinstance(value, float) else html.escape(str(value))
+
+
+def render_html(report):
+    total = sum(span['seconds'] for span in report['spans']) or 1
+    spans = [{**span, 'share': f'{span["seconds"] / total:.0%}'} for span in report['spans']]
+    columns = ['name', 'seconds', 'share'] + (['peak_mb'] if any('peak_mb' in span for span in spans) else [])
+    counters = [{'counter': key, 'value': value} for key, value in report['counters'].items()]
+    parts = [
+        f'<h1>Run of {report["started"]} ({report["seconds"]:.1f} s)</h1>',
+        '<h2>Stages</h2>', _table(spans, columns),
+        '<h2>Counters</h2>', _table(counters, ['counter', 'value']),
+    ]
+    if 'allocations' in report:
+        parts += ['<h2>Largest allocations</h2>', _table(report['allocations'], ['where', 'mb'])]
+    if 'profile' in report:
+        parts += ['<h2>Profile</h2>', f'<pre>{html.escape(report["profile"])}</pre>']
+    style = 'body{font-family:sans-serif}table{border-collapse:collapse}td,th{border:1px solid #ccc;padding:2px 8px}'
+    return f'<!DOCTYPE html><html><head><meta charset="utf-8"><style>{style}</style></head><body>{"".join(parts)}</body></html>'
@@ -0,0 +1,94 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+
+class Landmarks(NamedTuple):
+    """
+    Landmarks of many files in flat arrays sorted by file: row i is landmark `names[landmark_id[i]]` of file
+    `files[specimen_id[i]]` at `xy[i]`, and file j's rows are `offsets[j]:offsets[j + 1]`.
+    """
+    files: np.ndarray
+    names: np.ndarray
+    offsets: np.ndarray
+    specimen_id: np.ndarray
+    landmark_id: np.ndarray
+    xy: np.ndarray
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in self if array.dtype != object)
+
+    def specimen(self, i):
+        """Landmark ids and coordinates of file i, as views into the flat arrays."""
+        rows = slice(self.offsets[i], self.offsets[i + 1])
+        return self.landmark_id[rows], self.xy[rows]
+
+
+def from_points(stems, names, coords):
+    """Build Landmarks from per-file landmark names and (n, 2) coordinate arrays, numbering landmarks by first appearance."""
+    ids = {}
+    landmark_id = np.fromiter(
+        (ids.setdefault(name, len(ids)) for file_names in names for name in file_names),
+        dtype=np.int32
+    )
+    counts = np.array([len(file_names) for file_names in names], dtype=np.int64)
+    xy = np.concatenate(coords).astype(np.float64, copy=False) if len(coords) else np.empty((0, 2))
+    return Landmarks(
+        files=np.array(stems, dtype=object),
+        names=np.array(list(ids), dtype=object),
+        offsets=np.concatenate([[0], np.cumsum(counts)]),
+        specimen_id=np.repeat(np.arange(len(counts), dtype=np.int32), counts),
+        landmark_id=landmark_id,
+        xy=xy.reshape(-1, 2),
+    )
+
+
+def from_table(table):
+    """Landmarks of a long File/Landmark/x/y table; rows of a file must be contiguous, as points_table writes them."""
+    file_codes, files = pd.factorize(table['File'])
+    landmark_codes, names = pd.factorize(table['Landmark'])
+    counts = np.bincount(file_codes, minlength=len(files))
+    return Landmarks(
+        files=np.asarray(files, dtype=object),
+        names=np.asarray(names, dtype=object),
+        offsets=np.concatenate([[0], np.cumsum(counts)]),
+        specimen_id=file_codes.astype(np.int32),
+        landmark_id=landmark_codes.astype(np.int32),
+        xy=table[['x', 'y']].to_numpy(dtype=np.float64),
+    )
+
+
+def pack(data: Landmarks, landmarks):
+    """(files, landmarks, 2) array of the requested landmarks, NaN where a file lacks one."""
+    lookup = np.full(len(data.names) + 1, -1)
+    positions = {name: i for i, name in enumerate(data.names)}
+    for column, name in enumerate(landmarks):
+        if name in positions:
+            lookup[positions[name]] = column
+    columns = lookup[data.landmark_id]
+    keep = columns >= 0
+    coords = np.full((len(data.files), len(landmarks), 2), np.nan)
+    coords[data.specimen_id[keep], columns[keep]] = data.xy[keep]
+    return coords
+
+
+def to_table(data: Landmarks):
+    """Long File/Landmark/x/y table with categorical File and Landmark columns."""
+    return pd.DataFrame({
+        'File': pd.Categorical.from_codes(data.specimen_id, categories=data.files),
+        'Landmark': pd.Categorical.from_codes(data.landmark_id, categories=data.names),
+        'x': data.xy[:, 0],
+        'y': data.xy[:, 1],
+    })
+
+
+def to_wide(data: Landmarks):
+    """The Points layout: one x and one y row per file, one column per landmark, NaN where a file lacks one."""
+    values = pack(data, data.names)
+    return pd.DataFrame(
+        values.transpose(0, 2, 1).reshape(2 * len(data.files), len(data.names)),
+        index=pd.MultiIndex.from_product([data.files, ['x', 'y']], names=['File', None]),
+        columns=pd.Index(data.names)
+    )
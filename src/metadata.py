@@ -0,0 +1,72 @@
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+import pandas as pd
+
+# Fixed samples are placed on the culture time axis by stage, in hours after E12.5
+fixed_time_mapping = {
+    'E12.5': 0.0,
+    'E13': 12.0,
+    'E13.5': 24.0,
+    'E14': 36.0,
+    'E14.5': 48.0,
+    'E15': 60.0,
+}
+
+
+class PointsRecord(NamedTuple):
+    Info: str
+    Culture: str
+    Time: float
+    CultureType: str
+
+
+class SectionsRecord(NamedTuple):
+    Stage: str
+    Sample: str
+    AP: str
+    CultureTime: float
+    CultureType: str
+
+
+def culture_type(sample):
+    if 'CulIk' in sample:
+        return 'Ikemoto'
+    if 'Cul' in sample:
+        return 'Roller'
+    return 'Fixed'
+
+
+@lru_cache(maxsize=None)
+def parse_points_name(name):
+    """'E13.5 Cul 24h 1' -> ('E13.5', 'Cul', 24.0, 'Roller'); fixed samples take their time from the stage."""
+    info, culture, time = name.split(' ')[:3]
+    if 'Fix' in name:
+        time = fixed_time_mapping.get(info, float('nan'))
+    else:
+        time = float(re.sub('[A-z]*', '', time))
+    return PointsRecord(info, culture, time, culture_type(culture))
+
+
+@lru_cache(maxsize=None)
+def parse_sections_name(name):
+    """'E13.5 Cul1 ant 72' -> ('E13.5', 'Cul1', 'ant', 72.0, 'Roller')"""
+    stage, sample, ap, culture_time = name.split(' ')
+    return SectionsRecord(stage, sample, ap, float(culture_time), culture_type(sample))
+
+
+def _metadata(filenames, parse, fields):
+    codes, uniques = pd.factorize(filenames)
+    records = pd.DataFrame([parse(name) for name in uniques], columns=fields)
+    return records.iloc[codes].set_axis(filenames.index)
+
+
+def points_metadata(filenames: pd.Series):
+    """Info/Culture/Time/CultureType of every .points filename, parsing each distinct name once."""
+    return _metadata(filenames, parse_points_name, PointsRecord._fields)
+
+
+def sections_metadata(filenames: pd.Series):
+    """Stage/Sample/AP/CultureTime/CultureType of every sections filename, parsing each distinct name once."""
+    return _metadata(filenames, parse_sections_name, SectionsRecord._fields)
@@ -0,0 +1,46 @@
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+try:
+    from lxml.etree import iterparse
+except ImportError:
+    from xml.etree.ElementTree import iterparse
+
+
+def read_points(filename):
+    """
+    Stream the landmarks of a .points file into a list of names and an (n, 2) array of x/y coordinates, without
+    building a tree or a DataFrame.
+    """
+    names, xy = [], []
+    depth = 0
+    for event, node in iterparse(str(filename), events=('start', 'end')):
+        if event == 'start':
+            depth += 1
+            continue
+        depth -= 1
+        if depth == 1:
+            attrib = node.attrib
+            names.append(attrib['name'])
+            xy.append((float(attrib['x']), float(attrib['y'])))
+    return names, np.array(xy, dtype=float).reshape(-1, 2)
+
+
+def points_table(stems, names, coords):
+    """Long File/Landmark/x/y table from per-file names and coordinate arrays."""
+    coords = np.concatenate(coords) if len(coords) else np.empty((0, 2))
+    return pd.DataFrame({
+        'File': np.repeat(stems, [len(file_names) for file_names in names]),
+        'Landmark': list(chain.from_iterable(names)),
+        'x': coords[:, 0],
+        'y': coords[:, 1],
+    })
+
+
+def read_points_table(files):
+    files = list(files)
+    names, coords = zip(*map(read_points, files)) if files else ((), ())
+    return points_table([file.stem for file in files], names, coords)
+
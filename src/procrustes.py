@@ -0,0 +1,115 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from src.landmarks import pack
+from src.store import load_landmarks, results_folder
+
+
+def centroid_size(coords):
+    """Square root of the summed squared distances of the landmarks to their centroid: (n, L, 2) -> (n,)"""
+    centred = coords - coords.mean(axis=1, keepdims=True)
+    return np.sqrt((centred ** 2).sum(axis=(1, 2)))
+
+
+def rotate_to(shapes, reference):
+    """Rotate every (L, 2) shape onto the reference by least squares, without reflections."""
+    u, _, vt = np.linalg.svd(np.swapaxes(shapes, 1, 2) @ reference)
+    # Flip the last axis where the best fit would be a reflection
+    u[..., -1] *= np.sign(np.linalg.det(u @ vt))[:, None]
+    return shapes @ (u @ vt)
+
+
+def gpa(coords, max_iter=50, tol=1e-10):
+    """
+    Generalized Procrustes alignment of (n, L, 2) landmark configurations without missing landmarks: every
+    shape is centred, scaled to unit centroid size and rotated onto the mean shape, which is re-estimated until
+    it moves less than `tol` or after `max_iter` rounds. Returns the aligned shapes, the unit-size mean, the
+    centroid sizes and the number of rounds.
+    """
+    if max_iter < 1:
+        raise ValueError(f'max_iter must be at least 1, got {max_iter}')
+    sizes = centroid_size(coords)
+    shapes = (coords - coords.mean(axis=1, keepdims=True)) / sizes[:, None, None]
+    mean = shapes[0]
+    for iteration in range(1, max_iter + 1):
+        shapes = rotate_to(shapes, mean)
+        new_mean = shapes.mean(axis=0)
+        new_mean /= np.sqrt((new_mean ** 2).sum())
+        change = np.sqrt(((new_mean - mean) ** 2).sum())
+        mean = new_mean
+        if change < tol:
+            break
+    return shapes, mean, sizes, iteration
+
+
+def procrustes_distances(shapes, reference):
+    """Procrustes distance of every aligned shape to a reference shape: (n, L, 2), (L, 2) -> (n,)"""
+    return np.sqrt(((shapes - reference) ** 2).sum(axis=(1, 2)))
+
+
+def shape_pca(shapes, components=None):
+    """
+    PCA of aligned shapes through an SVD of the centred (n, 2L) matrix. Returns the scores (n, components), the
+    loadings (components, L, 2) and the share of the shape variance each component explains.
+    """
+    flat = shapes.reshape(len(shapes), -1)
+    flat = flat - flat.mean(axis=0)
+    u, s, vt = np.linalg.svd(flat, full_matrices=False)
+    components = components or len(s)
+    explained = s ** 2 / (s ** 2).sum()
+    return (u * s)[:, :components], vt[:components].reshape(components, *shapes.shape[1:]), explained[:components]
+
+
+def shape_frame(landmarks, metadata, names, by='Info', components=5, max_iter=50, tol=1e-10):
+    """
+    CentroidSize, ProcrustesDistance to the mean aligned shape of each `by` group (the stage by default) and the
+    first PC scores of every file, after GPA on the `names` landmarks. Files lacking any of them are left NaN.
+    Also returns the explained variance of each PC. Raises ValueError when fewer than two files have all the
+    landmarks, since there is nothing to align then.
+    """
+    coords = pack(landmarks, names)
+    complete = ~np.isnan(coords).any(axis=(1, 2))
+    if complete.sum() < 2:
+        raise ValueError(f'{complete.sum()} of {len(complete)} files have all of {", ".join(names)}; at least 2 are needed')
+    shapes, _, sizes, _ = gpa(coords[complete], max_iter, tol)
+    scores, _, explained = shape_pca(shapes, components)
+    columns = [f'PC{i + 1}' for i in range(scores.shape[1])]
+
+    index = pd.Index(landmarks.files, name='File')
+    groups = metadata.loc[index[complete], by].to_numpy()
+    distances = np.empty(len(shapes))
+    for group in pd.unique(groups):
+        members = groups == group
+        distances[members] = procrustes_distances(shapes[members], shapes[members].mean(axis=0))
+
+    frame = pd.DataFrame(np.nan, index=index, columns=['CentroidSize', 'ProcrustesDistance', *columns])
+    frame.loc[complete, 'CentroidSize'] = sizes
+    frame.loc[complete, 'ProcrustesDistance'] = distances
+    frame.loc[complete, columns] = scores
+    return frame.join(metadata), pd.Series(explained, index=columns, name='Explained variance')
+
+
+if __name__ == '__main__':
+    from main import point_pairing
+
+    default_landmarks = list(dict.fromkeys(name for pair in point_pairing for name in pair))
+    parser = argparse.ArgumentParser(description='Procrustes shape analysis of the stored landmarks')
+    parser.add_argument('--landmarks', nargs='+', default=default_landmarks, help='landmarks to align')
+    parser.add_argument('--by', default='Info', help='metadata column whose groups the Procrustes distances refer to')
+    parser.add_argument('--components', type=int, default=5, help='number of principal components to keep')
+    parser.add_argument('--max-iter', type=int, default=50, help='maximum number of GPA rounds')
+    parser.add_argument('--tol', type=float, default=1e-10, help='stop once the mean shape moves less than this')
+    args = parser.parse_args()
+    if args.max_iter < 1:
+        parser.error('--max-iter must be at least 1')
+
+    landmarks, metadata = load_landmarks()
+    try:
+        shapes, explained = shape_frame(landmarks, metadata, args.landmarks, args.by, args.components, args.max_iter, args.tol)
+    except ValueError as e:
+        parser.error(str(e))
+    shapes.to_parquet(results_folder / 'shapes.parquet')
+    print(f'Aligned {shapes["CentroidSize"].notna().sum()} of {len(shapes)} files on {len(args.landmarks)} landmarks')
+    print(explained.to_string())
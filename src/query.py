@@ -0,0 +1,63 @@
+from src.metadata import culture_type
+from src.sections import key_columns, load_sections
+from src.store import categorical_columns, load_distances, results_folder, store_categories
+
+
+def _match(column, value):
+    if isinstance(value, (list, tuple, set)):
+        return column, 'in', list(value)
+    return column, '==', value
+
+
+def _culture_types(culture=None, fixed=None):
+    types = {'Fixed', 'Roller', 'Ikemoto'}
+    if culture is not None:
+        types &= {culture} if isinstance(culture, str) else set(culture)
+    if fixed is not None:
+        types &= {'Fixed'} if fixed else {'Roller', 'Ikemoto'}
+    return types
+
+
+def distance_filters(stage=None, culture=None, fixed=None, time=None, folder=results_folder):
+    """
+    pyarrow filters on the distances for a stage (Info), culture type ('Fixed', 'Roller', 'Ikemoto'), fixed or
+    cultured, and time; each takes a value or a list. Culture types are resolved to the exact Culture values
+    recorded in the store, so no row is scanned for substrings.
+    """
+    filters = []
+    if stage is not None:
+        filters.append(_match('Info', stage))
+    if culture is not None or fixed is not None:
+        types = _culture_types(culture, fixed)
+        filters.append(('Culture', 'in', [value for value in store_categories(folder)['Culture'] if culture_type(value) in types]))
+    if time is not None:
+        filters.append(_match('Time', time))
+    return filters
+
+
+def select(measurements=None, stage=None, culture=None, fixed=None, time=None, metadata=('Info', 'Culture', 'Time'),
+           folder=results_folder):
+    """
+    The distances of the matching files, indexed by File, with only the `measurements` (all of them when None)
+    and `metadata` columns read from the store, e.g. select(['Dist(Left, Right)'], stage='E13.5', fixed=False).
+    """
+    columns = None if measurements is None else [*measurements, *metadata]
+    data = load_distances(columns, folder, distance_filters(stage, culture, fixed, time, folder) or None)
+    for column in categorical_columns:
+        if column in data.columns:
+            data[column] = data[column].cat.remove_unused_categories()
+    return data
+
+
+def select_sections(by=key_columns, stage=None, culture=None, fixed=None, ap=None, culture_time=None, **kwargs):
+    """load_sections(by) restricted to a stage, culture type, fixed or cultured, AP region and culture time."""
+    filters = []
+    if stage is not None:
+        filters.append(_match('Stage', stage))
+    if culture is not None or fixed is not None:
+        filters.append(('CultureType', 'in', list(_culture_types(culture, fixed))))
+    if ap is not None:
+        filters.append(_match('AP', ap))
+    if culture_time is not None:
+        filters.append(_match('CultureTime', culture_time))
+    return load_sections(by, filters=filters or None, **kwargs)
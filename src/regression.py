@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+
+def grouped_ols(data, x, y, by):
+    """
+    Fit y = Intercept + Slope * x by ordinary least squares within every group of `by` at once, from per-group
+    sums rather than one model per group. Gives the same Slope, Intercept, standard errors and N as
+    statsmodels' ols('y ~ x'). Rate is the slope as a fraction of the intercept, i.e. the slope of the fit of
+    y / Intercept, with its standard error.
+    """
+    data = data.dropna(subset=[x, y, *([by] if isinstance(by, str) else by)])
+    grouped = data.groupby(by)
+    codes = grouped.ngroup().to_numpy()
+    groups = grouped.size().index
+    xs = data[x].to_numpy(dtype=float)
+    ys = data[y].to_numpy(dtype=float)
+
+    n = np.bincount(codes, minlength=len(groups)).astype(float)
+    x_mean = np.bincount(codes, xs, len(groups)) / n
+    y_mean = np.bincount(codes, ys, len(groups)) / n
+    dx = xs - x_mean[codes]
+    dy = ys - y_mean[codes]
+    sxx = np.bincount(codes, dx * dx, len(groups))
+    sxy = np.bincount(codes, dx * dy, len(groups))
+    syy = np.bincount(codes, dy * dy, len(groups))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = sxy / sxx
+        intercept = y_mean - slope * x_mean
+        residual_variance = np.maximum(syy - slope * sxy, 0) / (n - 2)
+        slope_se = np.sqrt(residual_variance / sxx)
+        intercept_se = np.sqrt(residual_variance * (1 / n + x_mean ** 2 / sxx))
+        rate = slope / intercept
+        rate_se = slope_se / np.abs(intercept)
+
+    return pd.DataFrame({
+        'Slope': slope,
+        'Slope SE': slope_se,
+        'Intercept': intercept,
+        'Intercept SE': intercept_se,
+        'Rate': rate,
+        'Rate SE': rate_se,
+        'N': n,
+    }, index=groups)
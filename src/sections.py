@@ -0,0 +1,81 @@
+import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from src.cache import file_key, new_manifest, stale_files
+from src.metadata import sections_metadata
+from src.store import filter_rows, results_folder
+
+sections_folder = Path(__file__).parents[1] / 'data' / 'raw_sections'
+sections_store = results_folder / 'sections.parquet'
+
+key_columns = ['Stage', 'Sample', 'AP', 'CultureTime']
+measure_columns = ['Angle', 'Length']
+aggregate_columns = [f'{column}_{stat}' for column in measure_columns for stat in ('sum', 'count')]
+file_columns = ['path', 'size', 'mtime', 'hash', 'Filename']
+
+
+def read_section(file):
+    data = pd.read_csv(file, index_col=0)
+    row = {'Filename': file.stem}
+    for column in measure_columns:
+        row[f'{column}_sum'] = data[column].sum()
+        row[f'{column}_count'] = data[column].count()
+    return row
+
+
+def read_sections(files, workers=None):
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(read_section, files))
+
+
+def update_sections(folder=sections_folder, path=sections_store, workers=None, full_rebuild=False):
+    """
+    Bring the per-file sections table up to date and return it. Each row holds a file's signature, its filename
+    metadata and the sum and count of each measurement, so any grouping of files can be averaged exactly. Only
+    files that were added or changed since the table was written are read.
+    """
+    files = list(folder.glob('*.csv'))
+    manifest = new_manifest()
+    if path.exists() and not full_rebuild:
+        manifest['files'] = {row['path']: row for row in pd.read_parquet(path).to_dict('records')}
+    before = {key: entry['mtime'] for key, entry in manifest['files'].items()}
+
+    stale = stale_files(manifest, files)
+    for file, row in zip(stale, read_sections(list(stale), workers)):
+        manifest['files'][file_key(file)] = {'path': file_key(file), **stale[file], **row}
+
+    table = pd.DataFrame(list(manifest['files'].values()), columns=file_columns + aggregate_columns)
+    table[key_columns + ['CultureType']] = sections_metadata(table['Filename'])[key_columns + ['CultureType']]
+    if before != {key: entry['mtime'] for key, entry in manifest['files'].items()} or not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + '.tmp')
+        table.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+    return table
+
+
+def load_sections(by=key_columns, folder=sections_folder, path=sections_store, filters=None):
+    """
+    Mean Angle and Length of every `by` group, as `data.groupby(by).agg('mean')` over all the CSV rows would give.
+    `filters` are (column, op, value) conditions on the per-file table (key columns and CultureType).
+    """
+    table = filter_rows(update_sections(folder, path), filters)
+    sums = table.groupby(list(by))[aggregate_columns].sum()
+    return pd.DataFrame({
+        column: sums[f'{column}_sum'] / sums[f'{column}_count']
+        for column in measure_columns
+    })
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Aggregate data/raw_sections into results/sections.parquet')
+    parser.add_argument('--workers', type=int, default=None, help='number of files read at once')
+    parser.add_argument('--full-rebuild', action='store_true', help='ignore the existing table and re-read every file')
+    args = parser.parse_args()
+
+    table = update_sections(workers=args.workers, full_rebuild=args.full_rebuild)
+    print(f'{len(table)} sections files aggregated into {sections_store}')
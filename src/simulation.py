@@ -0,0 +1,77 @@
+import numpy as np
+
+
+def summarise_stream(chunks, lo, hi, bins=4096, quantiles=(.25, .5, .75)):
+    """
+    Reduce a stream of sample arrays to quantiles and a Gaussian KDE without keeping the samples: every chunk is
+    binned onto a fixed grid over [lo, hi] (values outside fall into the end bins) and the KDE is the binned
+    histogram smoothed with Scott's bandwidth. Memory depends on the chunk size and `bins`, not the sample count.
+    """
+    counts = np.zeros(bins)
+    n, total, total_sq = 0, 0.0, 0.0
+    low, high = np.inf, -np.inf
+    width = (hi - lo) / bins
+    for chunk in chunks:
+        index = np.clip(((chunk - lo) / width).astype(np.int64), 0, bins - 1)
+        counts += np.bincount(index, minlength=bins)
+        n += len(chunk)
+        total += chunk.sum()
+        total_sq += np.square(chunk).sum()
+        low, high = min(low, chunk.min()), max(high, chunk.max())
+
+    edges = lo + width * np.arange(bins + 1)
+    cumulative = np.concatenate([[0], np.cumsum(counts)])
+    mean = total / n
+    sd = np.sqrt(max(total_sq / n - mean ** 2, 0) * n / (n - 1))
+
+    bandwidth = sd * n ** (-1 / 5)
+    sigma = max(bandwidth / width, 1e-9)
+    offsets = np.arange(-int(4 * sigma) - 1, int(4 * sigma) + 2)
+    kernel = np.exp(-.5 * (offsets / sigma) ** 2)
+    density = np.convolve(counts, kernel / kernel.sum(), mode='same') / (n * width)
+    grid = edges[:-1] + width / 2
+    # Like seaborn, stop the density two bandwidths past the extreme draws
+    keep = (grid >= low - 2 * bandwidth) & (grid <= high + 2 * bandwidth)
+
+    return {
+        'n': n,
+        'mean': mean,
+        'sd': sd,
+        'quantiles': dict(zip(quantiles, np.interp(np.multiply(quantiles, n), cumulative, edges))),
+        'grid': grid[keep],
+        'density': density[keep],
+    }
+
+
+def simulate_normal(mean, sd, draws, rng, chunksize=100_000, **kwargs):
+    """Summary of `draws` normal draws from a seeded numpy Generator, streamed `chunksize` at a time."""
+    chunks = (rng.normal(mean, sd, min(chunksize, draws - start)) for start in range(0, draws, chunksize))
+    return summarise_stream(chunks, mean - 8 * sd, mean + 8 * sd, **kwargs)
+
+
+def split_violinplot(summaries, ax, order=None, hue_order=None, width=.8, colors=('C0', 'C1')):
+    """
+    Split violins drawn from precomputed summaries keyed by (x, hue), scaled like seaborn's default
+    (equal area), with dashed quartiles and a solid median.
+    """
+    order = order or list(dict.fromkeys(x for x, _ in summaries))
+    hue_order = hue_order or list(dict.fromkeys(hue for _, hue in summaries))
+    peak = max(summary['density'].max() for summary in summaries.values())
+
+    for position, x in enumerate(order):
+        for side, (hue, color) in enumerate(zip(hue_order, colors)):
+            summary = summaries.get((x, hue))
+            if summary is None:
+                continue
+            sign = -1 if side == 0 else 1
+            half = summary['density'] / peak * width / 2
+            ax.fill_betweenx(summary['grid'], position, position + sign * half, color=color, edgecolor='gray',
+                             label=hue if position == 0 else None)
+            for q, value in summary['quantiles'].items():
+                extent = np.interp(value, summary['grid'], half)
+                ax.plot([position, position + sign * extent], [value, value], color='gray',
+                        linestyle='-' if q == .5 else '--', lw=1)
+
+    ax.set_xticks(range(len(order)))
+    ax.set_xticklabels(order)
+    return ax
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+# Scales the median absolute deviation to the standard deviation of normally distributed data
+MAD_SCALE = 1.4826
+
+
+def _group_codes(data, by):
+    grouped = data.groupby(by)
+    return grouped.ngroup().fillna(-1).to_numpy(dtype=np.int64), grouped.size().index
+
+
+def group_statistics(data, by, columns, robust=False):
+    """
+    Centre and scale of every column within every group of `by` (column or index level names), from a single
+    factorisation of the group keys. The classic statistics are the mean and the population standard deviation
+    (ddof=0) and keep the count and sum of squared deviations so they can be merged later; the robust ones are the
+    median and the normal-consistent MAD. Columns of the result are (statistic, column) pairs.
+    """
+    codes, groups = _group_codes(data, by)
+    keep = codes >= 0
+    codes = codes[keep]
+    values = data[columns].to_numpy(dtype=float)[keep]
+    valid = ~np.isnan(values)
+    size = len(groups)
+
+    if robust:
+        frame = pd.DataFrame(values, columns=columns)
+        center = frame.groupby(codes).median().reindex(range(size))
+        scale = (frame - center.to_numpy()[codes]).abs().groupby(codes).median().reindex(range(size)) * MAD_SCALE
+        stats = {
+            'n': pd.DataFrame(valid, columns=columns).groupby(codes).sum().reindex(range(size)).to_numpy(),
+            'center': center.to_numpy(),
+            'scale': scale.to_numpy(),
+        }
+    else:
+        filled = np.where(valid, values, 0)
+        n = np.column_stack([np.bincount(codes, valid[:, j], size) for j in range(len(columns))])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.column_stack([np.bincount(codes, filled[:, j], size) for j in range(len(columns))]) / n
+        deviations = np.where(valid, values - mean[codes], 0)
+        m2 = np.column_stack([np.bincount(codes, deviations[:, j] ** 2, size) for j in range(len(columns))])
+        stats = _classic(n, mean, m2)
+
+    return pd.concat({stat: pd.DataFrame(array, index=groups, columns=columns) for stat, array in stats.items()}, axis=1)
+
+
+def _classic(n, mean, m2):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return {'n': n, 'center': mean, 'scale': np.sqrt(m2 / n), 'm2': m2}
+
+
+def merge_statistics(old, new):
+    """Combine classic group statistics of two cohorts as if they had been computed together."""
+    index = old.index.union(new.index)
+    old, new = old.reindex(index), new.reindex(index)
+    n_old, n_new = old['n'].fillna(0).to_numpy(), new['n'].fillna(0).to_numpy()
+    mean_old, mean_new = old['center'].fillna(0).to_numpy(), new['center'].fillna(0).to_numpy()
+    n = n_old + n_new
+    delta = mean_new - mean_old
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = mean_old + delta * n_new / n
+        m2 = old['m2'].fillna(0).to_numpy() + new['m2'].fillna(0).to_numpy() + delta ** 2 * n_old * n_new / n
+    columns = old['n'].columns
+    return pd.concat(
+        {stat: pd.DataFrame(array, index=index, columns=columns) for stat, array in _classic(n, mean, m2).items()},
+        axis=1
+    )
+
+
+def standardise(data, by, columns, robust=False, statistics=None):
+    """
+    Z-scores of `columns` within every group of `by`. Pass `statistics` from group_statistics (or
+    merge_statistics) to standardise new specimens against a stored cohort instead of their own groups; rows
+    whose group is not in the statistics come back NaN.
+    """
+    if statistics is None:
+        statistics = group_statistics(data, by, columns, robust)
+    codes, groups = _group_codes(data, by)
+    # Rows without a matching group point at the trailing NaN row
+    positions = np.append(statistics.index.get_indexer(groups), -1)[codes]
+    center = np.vstack([statistics['center'][columns].to_numpy(), np.full(len(columns), np.nan)])[positions]
+    scale = np.vstack([statistics['scale'][columns].to_numpy(), np.full(len(columns), np.nan)])[positions]
+    return (data[columns] - center) / scale
@@ -0,0 +1,195 @@
+import json
+import operator
+import os
+import shutil
+from pathlib import Path
+from urllib.parse import unquote
+
+import numpy as np
+import pandas as pd
+
+from src.landmarks import from_table, to_wide
+
+results_folder = Path(__file__).parents[1] / 'results'
+
+categorical_columns = ['Info', 'Culture']
+
+# The distances file is sorted by these and split into row groups, so filters on them skip whole row groups
+sort_columns = ['Info', 'Culture', 'Time']
+row_group_size = 1 << 16
+
+# Out-of-core runs write hive-partitioned datasets (points/Info=E13/Culture=Fix/part-0.parquet) instead
+partition_columns = ['Info', 'Culture']
+
+# Tables handed over by a parent process (see src.figures), keyed by the file they would otherwise be read from
+_preloaded = {}
+
+
+def _compact(data, float_columns):
+    data = _categorical(data.copy())
+    data[float_columns] = data[float_columns].astype(np.float32)
+    return data
+
+
+def _categorical(data):
+    for column in categorical_columns:
+        if column in data.columns:
+            data[column] = data[column].astype('category')
+    return data
+
+
+def _plain(data):
+    # Parquet only keeps usable row-group statistics for plain string columns, not dictionary (categorical) ones
+    return data.astype({column: object for column in categorical_columns if column in data.columns})
+
+
+def _categories(data):
+    return {column: sorted(map(str, data[column].dropna().unique())) for column in categorical_columns if column in data.columns}
+
+
+def write_store(points, distances, folder=results_folder):
+    """
+    Write the points (a long File/Landmark/x/y table) and distances as parquet files next to data.xlsx, with
+    the coordinates and distances as float32. The distances are sorted by Info/Culture/Time into row groups and
+    carry the distinct Info/Culture values in their metadata (see store_categories), so filtered reads only touch
+    the matching row groups. Each file is replaced atomically, so readers see either the previous or the new table.
+    """
+    distances = distances.rename_axis('File').reset_index()
+    distances = _compact(distances, [column for column in distances.columns if column.startswith('Dist(')])
+    distances = _plain(distances.sort_values(sort_columns, kind='stable'))
+    distances.attrs['categories'] = _categories(distances)
+    _replace_parquet(distances, folder / 'distances.parquet', row_group_size=row_group_size)
+    _replace_parquet(_compact(points, ['x', 'y']), folder / 'points.parquet')
+    for name in ['distances', 'points']:
+        shutil.rmtree(folder / name, ignore_errors=True)
+
+
+def _replace_parquet(data, path, **kwargs):
+    tmp = path.with_name(path.name + '.tmp')
+    data.to_parquet(tmp, index=False, **kwargs)
+    os.replace(tmp, path)
+
+
+def clear_store(folder=results_folder):
+    """Remove both store layouts, so readers never pick up a stale one."""
+    for name in ['distances', 'points']:
+        (folder / f'{name}.parquet').unlink(missing_ok=True)
+        shutil.rmtree(folder / name, ignore_errors=True)
+    for name in ['summary', 'summary_sketch']:
+        (folder / f'{name}.parquet').unlink(missing_ok=True)
+
+
+def write_partitions(points, distances, folder=results_folder, part=0):
+    """
+    Append one batch of files to the partitioned store, laid out as write_store lays them out (points long, so
+    batches with different landmarks share a schema) and split by Info/Culture. Every batch goes to its own
+    part-<part>.parquet in each partition.
+    """
+    distances = distances.rename_axis('File').reset_index()
+    distances = _compact(distances, [column for column in distances.columns if column.startswith('Dist(')])
+    points = _compact(points, ['x', 'y'])
+    for name, data in [('distances', distances), ('points', points)]:
+        data.to_parquet(
+            folder / name,
+            index=False,
+            partition_cols=partition_columns,
+            basename_template=f'part-{part}-{{i}}.parquet',
+            existing_data_behavior='overwrite_or_ignore',
+        )
+
+
+def _read_partitions(path, columns, filters):
+    if columns is not None:
+        columns = ['File', *columns]
+    data = pd.read_parquet(path, columns=columns, filters=filters)
+    for column in partition_columns:
+        if column in data.columns:
+            data[column] = data[column].cat.remove_unused_categories()
+    return data
+
+
+def load_distances(columns=None, folder=results_folder, filters=None):
+    """
+    Load the Distances table indexed by File, reading only the requested columns. Prefers the parquet store (either
+    layout) and falls back on the Distances sheet of data.xlsx. `filters` are pyarrow filters such as
+    [('Culture', '==', 'Fix')]; on the partitioned store those on Info/Culture skip whole partitions.
+    """
+    path = folder / 'distances.parquet'
+    if path in _preloaded:
+        data = filter_rows(_preloaded[path], filters)
+        return data.copy() if columns is None else data.loc[:, columns].copy()
+    if path.exists():
+        if any(op == 'in' and not len(value) for _, op, value in filters or ()):
+            # pyarrow cannot type an empty value set, and nothing can match it anyway
+            import pyarrow.parquet as pq
+            data = pq.read_schema(path).empty_table().to_pandas()
+            data = data if columns is None else data[['File', *columns]]
+        else:
+            data = pd.read_parquet(path, columns=None if columns is None else ['File', *columns], filters=filters)
+        return _categorical(data).set_index('File')
+    if (folder / 'distances').is_dir():
+        return _read_partitions(folder / 'distances', columns, filters).set_index('File')
+
+    data = pd.read_excel(folder / 'data.xlsx', sheet_name='Distances', index_col='File')
+    data = filter_rows(_compact(data, [column for column in data.columns if column.startswith('Dist(')]), filters)
+    return data if columns is None else data.loc[:, columns]
+
+
+operators = {
+    '==': operator.eq, '=': operator.eq, '!=': operator.ne,
+    '<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge,
+    'in': lambda column, values: column.isin(values), 'not in': lambda column, values: ~column.isin(values),
+}
+
+
+def filter_rows(data, filters):
+    """Apply pyarrow-style (column, op, value) filters, all of which must hold, to a frame in memory."""
+    if not filters:
+        return data
+    mask = np.ones(len(data), dtype=bool)
+    for column, op, value in filters:
+        mask &= operators[op](data[column], value).to_numpy(dtype=bool)
+    return data.loc[mask]
+
+
+def store_categories(folder=results_folder):
+    """
+    Distinct Info and Culture values of the stored distances, taken from the file metadata or the partition
+    folders without reading any rows.
+    """
+    path = folder / 'distances.parquet'
+    if path in _preloaded:
+        return _categories(_preloaded[path])
+    if path.exists():
+        import pyarrow.parquet as pq
+        attrs = json.loads((pq.read_schema(path).metadata or {}).get(b'PANDAS_ATTRS', b'{}'))
+        if 'categories' in attrs:
+            return attrs['categories']
+    elif (folder / 'distances').is_dir():
+        return {
+            column: sorted({unquote(part.name.split('=', 1)[1]) for part in (folder / 'distances').glob(pattern)})
+            for column, pattern in [('Info', 'Info=*'), ('Culture', 'Info=*/Culture=*')]
+        }
+    return _categories(load_distances(categorical_columns, folder))
+
+
+def preload_distances(data, folder=results_folder):
+    _preloaded[folder / 'distances.parquet'] = data
+
+
+def load_landmarks(folder=results_folder, filters=None):
+    """The stored points as Landmarks, with the Info/Culture/Time of every file."""
+    path = folder / 'points.parquet'
+    table = pd.read_parquet(path, filters=filters) if path.exists() else _read_partitions(folder / 'points', None, filters)
+    table = _categorical(table)
+    table['File'] = table['File'].astype(str)
+    metadata = table.groupby('File', sort=False)[['Info', 'Culture', 'Time']].first()
+    return from_table(table), metadata
+
+
+def load_points(folder=results_folder, filters=None):
+    """The stored points in the wide Points layout: rows (File, x/y), one column per landmark."""
+    if (folder / 'points.parquet').exists() or (folder / 'points').is_dir():
+        landmarks, metadata = load_landmarks(folder, filters)
+        return to_wide(landmarks).rename_axis(['File', 'Axis']).join(metadata, on='File')
+    return pd.read_excel(folder / 'data.xlsx', sheet_name='Points', index_col=[0, 1]).rename_axis(['File', 'Axis'])
@@ -0,0 +1,183 @@
+import argparse
+import hashlib
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from src.metadata import culture_type, points_metadata
+from src.store import _preloaded, _replace_parquet, load_distances, results_folder
+
+key_columns = ['Measurement', 'Info', 'CultureType', 'Culture', 'Time']
+group_columns = ['Info', 'Culture', 'Time']
+
+# Quantile sketch buckets: bucket i holds the values in (gamma ** (i - 1), gamma ** i], so any quantile read
+# back from the counts is within `relative_accuracy` of a value of the data
+relative_accuracy = .01
+gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+smallest_value = 1e-9
+
+
+class Cube(NamedTuple):
+    """
+    Summary of the distances per (Measurement, Info, CultureType, Culture, Time): count, sum, sum of squares,
+    min and max in `stats`, and the bucket counts of a log-scale quantile sketch in `sketch`. Cubes of disjoint
+    or overlapping sets of files merge exactly (see merge_cubes).
+    """
+    stats: pd.DataFrame
+    sketch: pd.Series
+
+    @property
+    def nbytes(self):
+        return int(self.stats.memory_usage(deep=True).sum() + self.sketch.memory_usage(deep=True))
+
+
+def _long(distances):
+    data = (
+        distances
+            .set_index(group_columns)
+            .filter(like='Dist(')
+            .rename_axis(columns='Measurement')
+            .stack()
+            .dropna()
+            .astype(float)
+            .rename('value')
+            .reset_index()
+    )
+    data['Info'] = data['Info'].astype(str)
+    data['Culture'] = data['Culture'].astype(str)
+    data['CultureType'] = data['Culture'].map(culture_type)
+    return data
+
+
+def summarise(distances):
+    """Cube of a distances table with Info/Culture/Time columns, e.g. one batch of files."""
+    data = _long(distances)
+    stats = (
+        data
+            .assign(square=data['value'] ** 2)
+            .groupby(key_columns, dropna=False)
+            .agg(count=('value', 'size'), sum=('value', 'sum'), sumsq=('square', 'sum'), min=('value', 'min'), max=('value', 'max'))
+    )
+    buckets = np.ceil(np.log(np.maximum(data['value'].to_numpy(), smallest_value)) / np.log(gamma)).astype(np.int32)
+    sketch = data.assign(Bucket=buckets).groupby([*key_columns, 'Bucket'], dropna=False).size().rename('count')
+    return Cube(stats, sketch)
+
+
+def merge_cubes(*cubes):
+    """One cube holding the rows summarised by all of cubes."""
+    stats = (
+        pd.concat([cube.stats for cube in cubes])
+            .groupby(key_columns, dropna=False)
+            .agg({'count': 'sum', 'sum': 'sum', 'sumsq': 'sum', 'min': 'min', 'max': 'max'})
+    )
+    sketch = pd.concat([cube.sketch for cube in cubes]).groupby([*key_columns, 'Bucket'], dropna=False).sum()
+    return Cube(stats, sketch)
+
+
+def update_cube(cube, distances, files):
+    """
+    Bring a cube up to date after the `files` (stems, added, changed or removed) were ingested: the
+    Info/Culture/Time groups they belong to are summarised again from distances, the other groups are kept.
+    """
+    touched = pd.MultiIndex.from_frame(points_metadata(pd.Series(list(files), dtype=str))[group_columns].drop_duplicates())
+    keep = ~cube.stats.index.droplevel(['Measurement', 'CultureType']).isin(touched)
+    keep_sketch = ~cube.sketch.index.droplevel(['Measurement', 'CultureType', 'Bucket']).isin(touched)
+    groups = pd.MultiIndex.from_frame(distances[group_columns].astype({'Info': str, 'Culture': str}))
+    return merge_cubes(Cube(cube.stats.loc[keep], cube.sketch.loc[keep_sketch]), summarise(distances.loc[groups.isin(touched)]))
+
+
+def cube_key(key, distances):
+    """Key of a cube of distances measured from the ingestion cache state `key`, and of the measurements taken."""
+    digest = hashlib.sha256(key.encode())
+    for column in sorted(distances.filter(like='Dist(').columns):
+        digest.update(f'\0{column}'.encode())
+    return digest.hexdigest()
+
+
+def refresh_cube(distances, files, previous, key, folder=results_folder):
+    """
+    Update the stored cube for the ingested `files` when it was written from the `previous` state of the
+    ingestion cache (see cache.manifest_key) and the same measurements, summarise all the distances again
+    otherwise (e.g. after the point pairing changed), and store it with `key`.
+    """
+    cube = load_cube(folder) if (folder / 'summary.parquet').exists() else None
+    if cube is not None and cube.stats.attrs.get('key') == cube_key(previous, distances):
+        cube = update_cube(cube, distances, files)
+    else:
+        cube = summarise(distances)
+    cube.stats.attrs['key'] = cube_key(key, distances)
+    write_cube(cube, folder)
+    return cube
+
+
+def write_cube(cube, folder=results_folder):
+    stats = cube.stats.reset_index()
+    stats.attrs = cube.stats.attrs
+    _replace_parquet(stats, folder / 'summary.parquet')
+    _replace_parquet(cube.sketch.reset_index(), folder / 'summary_sketch.parquet')
+
+
+def preload_cube(cube, folder=results_folder):
+    """Serve cube to load_cube(folder) instead of the stored one, like store.preload_distances."""
+    _preloaded[folder / 'summary.parquet'] = cube
+
+
+def load_cube(folder=results_folder):
+    """The stored cube, or one summarised from the distances when none was written yet."""
+    if folder / 'summary.parquet' in _preloaded:
+        return _preloaded[folder / 'summary.parquet']
+    if (folder / 'summary.parquet').exists() and (folder / 'summary_sketch.parquet').exists():
+        return Cube(
+            pd.read_parquet(folder / 'summary.parquet').set_index(key_columns),
+            pd.read_parquet(folder / 'summary_sketch.parquet').set_index([*key_columns, 'Bucket'])['count'],
+        )
+    return summarise(load_distances(folder=folder))
+
+
+def rollup(cube, by, measurements=None, quantiles=()):
+    """
+    count, mean, std, min, max and the given quantiles (e.g. .5 -> column '50%', within 1%) of every `by` group,
+    pooling the rows of the `measurements` (all of them by default), like a groupby over the long distances.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    stats, sketch = cube
+    if measurements is not None:
+        stats = stats.loc[stats.index.get_level_values('Measurement').isin(measurements)]
+        sketch = sketch.loc[sketch.index.get_level_values('Measurement').isin(measurements)]
+
+    totals = stats.groupby(by, dropna=False).agg({'count': 'sum', 'sum': 'sum', 'sumsq': 'sum', 'min': 'min', 'max': 'max'})
+    n = totals['count']
+    table = pd.DataFrame({
+        'count': n,
+        'mean': totals['sum'] / n,
+        'std': np.sqrt(np.maximum(totals['sumsq'] - totals['sum'] ** 2 / n, 0) / (n - 1)),
+        'min': totals['min'],
+        'max': totals['max'],
+    })
+
+    if quantiles:
+        counts = sketch.groupby([*by, 'Bucket'], dropna=False).sum().sort_index()
+        grouped = counts.groupby(by, dropna=False, sort=False)
+        cumulative, total = grouped.cumsum(), grouped.transform('sum')
+        for q in quantiles:
+            # First bucket whose cumulative count passes the rank of the quantile
+            reached = cumulative > q * (total - 1)
+            first = reached.loc[reached].groupby(by, dropna=False, sort=False).head(1).index
+            values = pd.Series(2 * gamma ** first.get_level_values('Bucket').to_numpy() / (gamma + 1), index=first.droplevel('Bucket'))
+            table[f'{q:.0%}'] = values.reindex(table.index).clip(table['min'], table['max'])
+    return table
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Summary table of the distances from the precomputed cube')
+    parser.add_argument('--by', nargs='+', default=['Measurement', 'Info', 'CultureType'], help=f'columns to group by, among {", ".join(key_columns)}')
+    parser.add_argument('--measurements', nargs='+', default=None, help='distances to include (default: all of them)')
+    parser.add_argument('--quantiles', nargs='+', type=float, default=[.25, .5, .75], help='quantiles to estimate from the sketch')
+    args = parser.parse_args()
+    unknown = set(args.by) - set(key_columns)
+    if unknown:
+        parser.error(f'unknown columns: {", ".join(sorted(unknown))}')
+
+    cube = load_cube()
+    print(rollup(cube, args.by, args.measurements, args.quantiles).to_string())
@@ -0,0 +1,62 @@
+from pathlib import Path
+
+import numpy as np
+
+from main import point_pairing
+
+landmarks = list(dict.fromkeys(name for pair in point_pairing for name in pair))
+
+stages = ['E12.5', 'E13', 'E13.5', 'E14', 'E14.5', 'E15']
+culture_hours = [0, 17, 24, 41, 48, 65, 72]
+ikemoto_hours = [0, 24, 48]
+
+
+def specimen_name(rng, number):
+    """A filename in the Info Culture Time convention: fixed, roller (Cul) or Ikemoto (CulIk) culture."""
+    kind = rng.integers(3)
+    if kind == 0:
+        return f'{rng.choice(stages)} Fix {number}'
+    if kind == 1:
+        return f'{rng.choice(["E12.5", "E13.5"])} Cul {rng.choice(culture_hours)}h {number}'
+    return f'{rng.choice(["E12.5", "E13.5"])} CulIk {rng.choice(ikemoto_hours)}h {number}'
+
+
+def write_points(folder: Path, specimens, seed=0, missing=.02):
+    """
+    Write `specimens` .points files into folder. Every file holds the point_pairing landmarks around a fixed
+    template, scaled and jittered per specimen, with each landmark dropped with probability `missing`.
+    """
+    folder.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    template = rng.uniform(0, 10, size=(len(landmarks), 2))
+    files = []
+    for number in range(specimens):
+        coords = template * rng.uniform(.8, 1.2) + rng.normal(0, .1, size=template.shape)
+        points = ''.join(
+            f'<point name="{name}" x="{x:.6f}" y="{y:.6f}"/>'
+            for name, (x, y), keep in zip(landmarks, coords, rng.random(len(landmarks)) >= missing)
+            if keep
+        )
+        path = folder / f'{specimen_name(rng, number)}.points'
+        path.write_text(f'<?xml version="1.0" encoding="UTF-8"?>\n<points>{points}</points>\n')
+        files.append(path)
+    return files
+
+
+def write_sections(folder: Path, specimens, seed=0, rows=(3, 12)):
+    """Write sections CSVs (Stage Sample AP CultureTime) with Angle/Length rows for `specimens` samples."""
+    folder.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    files = []
+    for number in range(specimens):
+        stage = rng.choice(['E12.5', 'E13.5', 'E15.5'])
+        sample, times = [(f'Fix{number}', [0]), (f'Cul{number}', [0, 20, 72]), (f'CulIk{number}', [0, 48])][rng.integers(3)]
+        for time in times:
+            for ap in ['ant', 'mid', 'post']:
+                n = rng.integers(*rows)
+                angle = rng.uniform(10, 90, n)
+                length = rng.uniform(.3, 1, n)
+                path = folder / f'{stage} {sample} {ap} {time}.csv'
+                path.write_text(',Angle,Length\n' + ''.join(f'{i},{a:.3f},{l:.4f}\n' for i, (a, l) in enumerate(zip(angle, length))))
+                files.append(path)
+    return files
@@ -0,0 +1,45 @@
+import re
+
+import pandas as pd
+
+# Hours in culture -> developmental age (days) of an explant dissected at E12.5
+cultured_mapping = {
+    0: 12.5,
+    17: 13,
+    24: 13.5,
+    41: 14,
+    48: 14.5,
+    65: 15,
+    72: 15.5
+}
+
+
+def _stage(info):
+    match = re.search(r'E[1-9\.]*', info)
+    return match.group() if match else float('nan')
+
+
+def _align(info, culture, time):
+    culture_type = 'Ikemoto' if 'CulIk' in culture else 'Normal'
+    if 'Fix' in culture and culture_type == 'Normal':
+        return culture_type, 'In vivo', float(info.replace('E', ''))
+    stage = _stage(info)
+    age = cultured_mapping.get(time, float('nan'))
+    if isinstance(stage, str):
+        age += float(stage.replace('E', '')) - 12.5
+    return culture_type, stage, age
+
+
+def align_time(data):
+    """
+    Add CultureType and Stage/Fixed and turn Time into the developmental age in days: cultured samples are placed
+    by their hours in culture after the stage they were dissected at, fixed samples by their stage. The lookup is
+    built once per distinct (Info, Culture, Time) and broadcast back to the rows.
+    """
+    grouped = data.groupby(['Info', 'Culture', 'Time'], sort=False, dropna=False, observed=True)
+    codes = grouped.ngroup().to_numpy()
+    table = pd.DataFrame(
+        [_align(*key) for key in grouped.size().index],
+        columns=['CultureType', 'Stage/Fixed', 'Time']
+    )
+    return data.assign(**{column: table[column].to_numpy()[codes] for column in table.columns})
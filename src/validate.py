@@ -0,0 +1,38 @@
+from collections import Counter
+
+import numpy as np
+
+from src.metadata import parse_points_name
+
+
+class InvalidPoints(ValueError):
+    pass
+
+
+def filename_problems(stem):
+    try:
+        parse_points_name(stem)
+    except ValueError:
+        return ['filename does not follow the "Info Culture Time" convention']
+    return []
+
+
+def points_problems(stem, names, coords, pairing, required=()):
+    """
+    Reasons to quarantine a parsed .points file: a filename outside the Info Culture Time convention, duplicated
+    landmarks, non-finite coordinates, missing `required` landmarks or not a single measurable pair.
+    """
+    problems = filename_problems(stem)
+    duplicated = [name for name, count in Counter(names).items() if count > 1]
+    if duplicated:
+        problems.append(f'duplicated landmarks {", ".join(duplicated)}')
+    bad = [name for name, finite in zip(names, np.isfinite(coords).all(axis=1)) if not finite]
+    if bad:
+        problems.append(f'non-finite coordinates for {", ".join(bad)}')
+    present = set(names) - set(bad)
+    missing = [name for name in required if name not in present]
+    if missing:
+        problems.append(f'missing required landmarks {", ".join(missing)}')
+    if not any(a in present and b in present for a, b in pairing):
+        problems.append('no measurable distance')
+    return problems
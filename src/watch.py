@@ -0,0 +1,170 @@
+import argparse
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from main import parse_files, parse_filename, measure_distances
+from src.cache import collect, discard, load_manifest, manifest_key, save_manifest, stale_files, store
+from src.excel import replace_excel
+from src.landmarks import to_table, to_wide
+from src.sections import sections_folder, update_sections
+from src.store import results_folder, write_store
+from src.summary import refresh_cube
+
+try:
+    from watchfiles import awatch
+except ImportError:
+    awatch = None
+
+points_folder = Path(__file__).parents[1] / 'data' / 'raw'
+cache_path = results_folder / 'ingest_cache.pkl'
+
+
+def snapshot(folders):
+    return {
+        path: (stat.st_size, stat.st_mtime_ns)
+        for folder, pattern in folders
+        for path in folder.glob(pattern)
+        for stat in [path.stat()]
+    }
+
+
+async def poll(folders, interval):
+    """Yield the set of paths added, changed or removed since the last look, checking every `interval` seconds."""
+    previous = snapshot(folders)
+    while True:
+        await asyncio.sleep(interval)
+        current = snapshot(folders)
+        changed = {path for path in current.keys() | previous.keys() if current.get(path) != previous.get(path)}
+        previous = current
+        if changed:
+            yield changed
+
+
+async def changes(folders, interval):
+    """File system notifications when watchfiles is installed, polling otherwise."""
+    if awatch is None:
+        async for changed in poll(folders, interval):
+            yield changed
+        return
+    patterns = {folder: pattern for folder, pattern in folders}
+    async for events in awatch(*patterns, debounce=50):
+        changed = {Path(path) for _, path in events}
+        changed = {path for path in changed if path.match(patterns.get(path.parent, '*'))}
+        if changed:
+            yield changed
+
+
+async def debounce(source, delay):
+    """Merge bursts of changes: yield once nothing new has arrived for `delay` seconds."""
+    queue = asyncio.Queue()
+
+    async def produce():
+        async for changed in source:
+            await queue.put(changed)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            pending = await queue.get()
+            while True:
+                try:
+                    pending |= await asyncio.wait_for(queue.get(), delay)
+                except asyncio.TimeoutError:
+                    break
+            yield pending
+    finally:
+        producer.cancel()
+
+
+class Watcher:
+    """
+    Keeps the ingestion cache in memory and republishes the results whenever the raw data changes: only the new
+    or modified .points files are parsed (in a process pool) and the distances, parquet store, summary cube and,
+    optionally, data.xlsx are rewritten atomically.
+    """
+
+    def __init__(self, workers=None, chunksize=16, excel=False):
+        self.manifest = load_manifest(cache_path)
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.chunksize = chunksize
+        self.excel = excel
+
+    async def refresh_points(self):
+        loop = asyncio.get_running_loop()
+        # Same order as main.py, which globs the same folder
+        files = list(points_folder.glob('*.points'))
+        previous, known = manifest_key(self.manifest), set(self.manifest['files'])
+        stale = stale_files(self.manifest, files)
+        changed = [Path(key).stem for key in known - set(self.manifest['files'])]
+        if not stale and not changed:
+            return 0, []
+
+        paths = list(stale)
+        chunks = [paths[i:i + self.chunksize] for i in range(0, len(paths), self.chunksize)]
+        results = await asyncio.gather(*(loop.run_in_executor(self.executor, parse_files, chunk) for chunk in chunks))
+        quarantined = []
+        for filename, points, _, error in (result for chunk in results for result in chunk):
+            if error is None:
+                store(self.manifest, filename, stale[filename], points)
+                changed.append(filename.stem)
+            else:
+                quarantined.append((filename.stem, error))
+                # A cached file that changed and no longer parses must not keep its old points
+                if discard(self.manifest, filename):
+                    changed.append(filename.stem)
+        await loop.run_in_executor(None, self.publish, files, changed, previous)
+        return len(stale) - len(quarantined), quarantined
+
+    def publish(self, files, changed, previous):
+        save_manifest(self.manifest, cache_path)
+        landmarks = collect(self.manifest, files)
+        metadata = parse_filename(pd.Series(landmarks.files, index=landmarks.files))
+        distances = measure_distances(landmarks).join(metadata)
+        write_store(to_table(landmarks).join(metadata, on='File'), distances, results_folder)
+        refresh_cube(distances, changed, previous, manifest_key(self.manifest), results_folder)
+        if self.excel:
+            sheets = {'Points': to_wide(landmarks).join(metadata, on='File'), 'Distances': distances}
+            replace_excel(sheets, results_folder / 'data.xlsx')
+
+    async def refresh_sections(self):
+        path = results_folder / 'sections.parquet'
+        await asyncio.get_running_loop().run_in_executor(None, update_sections, sections_folder, path)
+
+    async def update(self, changed=None):
+        start = time.perf_counter()
+        if changed is None or any(path.suffix == '.points' for path in changed):
+            parsed, quarantined = await self.refresh_points()
+            if parsed or quarantined:
+                print(f'{parsed} .points files updated, {len(quarantined)} quarantined')
+            for stem, error in quarantined:
+                print(f'  {stem}: {error}')
+        if changed is None or any(path.suffix == '.csv' for path in changed):
+            await self.refresh_sections()
+        print(f'Results published in {time.perf_counter() - start:.3f} s')
+
+    async def run(self, interval=1.0, delay=.5):
+        folders = [(points_folder, '*.points'), (sections_folder, '*.csv')]
+        await self.update()
+        async for changed in debounce(changes(folders, interval), delay):
+            await self.update(changed)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Watch data/raw and data/raw_sections and keep the results up to date')
+    parser.add_argument('--workers', type=int, default=None, help='size of the process pool')
+    parser.add_argument('--interval', type=float, default=1.0, help='seconds between polls when watchfiles is not installed')
+    parser.add_argument('--debounce', type=float, default=.5, help='seconds of quiet to wait for after a change')
+    parser.add_argument('--excel', action='store_true', help='also rewrite results/data.xlsx on every update')
+    args = parser.parse_args()
+
+    watcher = Watcher(args.workers, excel=args.excel)
+    try:
+        asyncio.run(watcher.run(args.interval, args.debounce))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.executor.shutdown(cancel_futures=True)